@@ -1,65 +1,235 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 import uuid
 import time
 import numpy as np
 from collections import defaultdict
 import datetime
 import os
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import asyncio
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Response
 from pathlib import Path
-import tempfile
 from src.utils.pdf_processor import TextProcessor
-from src.llm.indexing import Indexing
+from src.utils.attachment import DEFAULT_CHUNK_SIZE as UPLOAD_CHUNK_SIZE
+from src.llm.indexing import Indexing, get_job, index_cfg
+from src.llm.ingestion import IngestionQueue, get_ingestion_queue, ingest_cfg, resolve_path
+from src.llm.bulk_ingest import is_archive, iter_archive_pdfs, iter_pdf_sources
 
 app = FastAPI(title="Chatbot")
 
 os.environ["LANGSMITH_TRACING"] = "true"
 
+class IngestDirectoryRequest(BaseModel):
+    path: str
+
 class DeleteDocRequest(BaseModel):
     file_name: str
+    wait: bool = False
+    timeout: Optional[float] = None
+
+# Server-side directories /ingest-directory may read from
+INGEST_ROOTS = [resolve_path(root, "data").resolve() for root in ingest_cfg.get("allowed_roots", ["data"])]
+
+_index_processor = None
+
+def get_index_processor() -> Indexing:
+    """Build the Indexing service once per process and reuse it."""
+    global _index_processor
+    if _index_processor is None:
+        _index_processor = Indexing(TextProcessor())
+    return _index_processor
+
+def run_ingestion_job(job, progress):
+    """Worker side of an upload: parse, diff and upsert, then wait until searchable."""
+    return get_index_processor().insert_doc(
+        file_path=job["file_path"],
+        file_name=job["document_name"],
+        wait=True,
+        progress=progress
+    )
+
+def get_queue() -> IngestionQueue:
+    return get_ingestion_queue(run_ingestion_job)
+
+@app.on_event("startup")
+def start_ingestion_workers():
+    # Also resumes jobs that were queued or running when the process stopped
+    get_queue().start()
+
+@app.on_event("shutdown")
+def stop_ingestion_workers():
+    get_queue().stop(timeout=5)
+
+async def save_upload(file: UploadFile, path: Path):
+    """Stream an upload to `path`; disk writes run off the event loop."""
+    f = await asyncio.to_thread(open, path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await asyncio.to_thread(f.write, chunk)
+    finally:
+        await asyncio.to_thread(f.close)
 
-@app.post("/upload-doc")
-async def upload_doc(file: UploadFile = File(...)):
+@app.post("/upload-doc", status_code=202)
+async def upload_doc(
+    response: Response,
+    file: UploadFile = File(...),
+    wait: bool = Query(False, description="Block until the document is indexed and searchable"),
+    timeout: Optional[float] = Query(None, description="Max seconds to wait when wait=true; defaults to consistency_timeout + queue_wait_seconds")
+):
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
 
-    tmp_path = None
+    queue = get_queue()
+    job_id = queue.new_job_id()
+    path = queue.upload_path(job_id, Path(file.filename).suffix.lower() or ".pdf")
 
     try:
-        # 1️⃣ Save uploaded bytes to temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
-
-        # 2️⃣ Process PDF
-        index_processor=Indexing(TextProcessor())
-        message = index_processor.insert_doc(
-            file_path=tmp_path,
-            file_name=file.filename
-        )
+        # 1️⃣ Stream uploaded bytes to the queue's upload directory
+        await save_upload(file, path)
 
-        return f"{file.filename} uploaded successfully"
+        # 2️⃣ Hand the PDF to the ingestion workers
+        job = await asyncio.to_thread(queue.enqueue, file.filename, path, job_id=job_id)
 
     except Exception as e:
+        # 3️⃣ Cleanup
+        if path.exists():
+            path.unlink()
         raise HTTPException(status_code=500, detail=str(e))
 
-    finally:
+    if not wait:
+        return {"message": f"{file.filename} queued for indexing", "job": job}
+
+    # 4️⃣ wait=true: bounded wait on the queued job; 202 if it is still queued or running
+    if timeout is None:
+        timeout = index_cfg.get("consistency_timeout", 30) + ingest_cfg.get("queue_wait_seconds", 120)
+    job = await asyncio.to_thread(queue.wait, job_id, timeout)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "done":
+        return {"message": f"{file.filename} is still being indexed", "job": job}
+    response.status_code = 200
+    return {"message": f"{file.filename} indexed successfully", "job": job}
+
+def enqueue_bulk_sources(queue, batch_id, uploads):
+    """Queue every PDF from spooled uploads; archives are expanded into the upload dir."""
+    jobs = []
+    for filename, path in uploads:
+        if is_archive(filename):
+            try:
+                for name, member_path in iter_archive_pdfs(path, queue.upload_dir):
+                    jobs.append(queue.enqueue(name, member_path, batch_id=batch_id))
+            finally:
+                path.unlink(missing_ok=True)
+        else:
+            jobs.append(queue.enqueue(filename, path, job_id=path.stem, batch_id=batch_id))
+    return jobs
+
+@app.post("/upload-docs", status_code=202)
+async def upload_docs(files: List[UploadFile] = File(...)):
+    for file in files:
+        if not (file.filename.lower().endswith(".pdf") or is_archive(file.filename)):
+            raise HTTPException(status_code=400, detail=f"{file.filename}: only PDFs or zip/tar archives allowed")
+
+    queue = get_queue()
+    batch_id = uuid.uuid4().hex
+    uploads = []
+
+    try:
+        # 1️⃣ Stream every upload to the queue's upload directory
+        for file in files:
+            suffix = ".pdf" if file.filename.lower().endswith(".pdf") else ".archive"
+            path = queue.upload_path(queue.new_job_id(), suffix)
+            uploads.append((file.filename, path))
+            await save_upload(file, path)
+
+        # 2️⃣ One job per PDF, grouped under a batch id
+        jobs = await asyncio.to_thread(enqueue_bulk_sources, queue, batch_id, uploads)
+        return {"message": f"{len(jobs)} documents queued for indexing", "batch_id": batch_id, "jobs": [j["id"] for j in jobs]}
+
+    except Exception as e:
         # 3️⃣ Cleanup
-        if tmp_path and os.path.exists(tmp_path):
-            os.remove(tmp_path)
+        for _, path in uploads:
+            if path.exists() and queue.get(path.stem) is None:
+                path.unlink()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/ingest-directory", status_code=202)
+async def ingest_directory(request: IngestDirectoryRequest):
+    # Relative paths are relative to the project root, like INGEST_ROOTS, not the server's cwd
+    directory = resolve_path(request.path, "data").resolve()
+    if not any(directory.is_relative_to(root) for root in INGEST_ROOTS):
+        raise HTTPException(status_code=403, detail=f"{request.path} is outside the allowed ingestion roots")
+    if not directory.is_dir():
+        raise HTTPException(status_code=404, detail=f"{request.path} is not a directory")
+
+    queue = get_queue()
+    batch_id = uuid.uuid4().hex
+
+    def enqueue_directory():
+        # PDFs are read in place and left where they are
+        return [
+            queue.enqueue(name, path, batch_id=batch_id, keep_file=True)
+            for name, path, _ in iter_pdf_sources([directory], queue.upload_dir)
+        ]
+
+    jobs = await asyncio.to_thread(enqueue_directory)
+    return {"message": f"{len(jobs)} documents queued for indexing", "batch_id": batch_id, "jobs": [j["id"] for j in jobs]}
+
+@app.get("/batches/{batch_id}")
+async def batch_status(batch_id: str):
+    summary = await asyncio.to_thread(get_queue().batch_summary, batch_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Unknown batch id")
+    return summary
 
 @app.post("/delete-doc")
 async def delete_doc(request: DeleteDocRequest):
     try:
         # 2️⃣ Process PDF
-        index_processor=Indexing(TextProcessor())
-        message = index_processor.delete_doc(
-            file_name=request.file_name
+        index_processor=get_index_processor()
+        job = await asyncio.to_thread(
+            index_processor.delete_doc,
+            file_name=request.file_name,
+            wait=request.wait,
+            timeout=request.timeout
         )
 
-        return f"{request.file_name} deleted successfully"
+        return {"message": f"{request.file_name} deleted successfully", "job": job}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/index-jobs/{job_id}")
+async def index_job_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+
+    # One non-blocking visibility check per status request
+    await asyncio.to_thread(job.refresh)
+    return job.to_dict()
+
+@app.get("/documents")
+async def list_documents():
+    return get_index_processor().list_documents()
+
+@app.get("/jobs/{job_id}")
+async def ingestion_job_status(job_id: str):
+    job = await asyncio.to_thread(get_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job
+
+@app.post("/jobs/{job_id}/retry", status_code=202)
+async def retry_ingestion_job(job_id: str):
+    job = await asyncio.to_thread(get_queue().retry, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No failed job with this id")
+    return job
+
+@app.get("/jobs")
+async def list_ingestion_jobs(
+    status: Optional[str] = Query(None, description="queued, running, done or failed"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    return await asyncio.to_thread(get_queue().list, status, limit)
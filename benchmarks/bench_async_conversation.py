@@ -0,0 +1,76 @@
+"""
+Load benchmark: blocking vs async agent inference inside an asyncio handler.
+
+The blocking path mirrors the old `/conversation` handler (an `async def`
+calling `agent.invoke`), the async path mirrors the new one (`await
+agent.ainvoke`). Both drive the same LangChain agent against a local fake
+Mistral server, so the numbers only reflect event-loop behaviour.
+
+    python benchmarks/bench_async_conversation.py --requests 200 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+# Keep benchmark runs out of the tracked logs/app.log (child processes inherit it)
+os.environ.setdefault("APP_LOG_FILE", "")
+
+from langchain.agents import create_agent
+from langchain.messages import HumanMessage
+from langchain_mistralai import ChatMistralAI
+
+from benchmarks.fake_mistral import FakeMistralServer
+
+
+def build_agent(endpoint: str, max_concurrency: int):
+    model = ChatMistralAI(
+        model="fake-model",
+        api_key="fake",
+        endpoint=endpoint,
+        temperature=0,
+        max_retries=1,
+        max_concurrent_requests=max_concurrency,
+    )
+    return create_agent(model=model, tools=[])
+
+
+async def blocking_handler(agent, query: str):
+    response = agent.invoke({"messages": [HumanMessage(content=query)]})
+    return response["messages"][-1].content
+
+
+async def async_handler(agent, query: str):
+    response = await agent.ainvoke({"messages": [HumanMessage(content=query)]})
+    return response["messages"][-1].content
+
+
+async def run(handler, agent, requests: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(agent, f"question {i}") for i in range(requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model latency in seconds")
+    args = parser.parse_args()
+
+    with FakeMistralServer(latency=args.latency) as server:
+        agent = build_agent(server.endpoint, max_concurrency=args.requests)
+
+        for name, handler in (("blocking invoke", blocking_handler), ("async ainvoke", async_handler)):
+            elapsed = asyncio.run(run(handler, agent, args.requests))
+            print(
+                f"{name:<16} {args.requests} requests in {elapsed:7.2f}s "
+                f"-> {args.requests / elapsed:8.1f} req/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
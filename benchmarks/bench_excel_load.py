@@ -0,0 +1,101 @@
+"""
+Load time and peak memory of the Excel paths of the SQL tool.
+
+Writes a synthetic workbook (a large `Sales` sheet plus a small `Regions`
+sheet) and loads it into an in-memory DuckDB connection with each engine,
+every run in a fresh interpreter so peak RSS is not shared between them:
+
+- `pandas`:   `pd.read_excel` of every sheet, then register + CREATE TABLE
+- `openpyxl`: read-only streaming into Arrow batches (`src.utils.excel_loader`)
+
+    python benchmarks/bench_excel_load.py --rows 500000
+    python benchmarks/bench_excel_load.py --workbook data.xlsx --engine openpyxl
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+# Keep benchmark runs out of the tracked logs/app.log (child processes inherit it)
+os.environ.setdefault("APP_LOG_FILE", "")
+
+ENGINES = ["pandas", "openpyxl"]
+
+RUNNER = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+import duckdb
+from src.utils.excel_loader import load_workbook_pandas, load_workbook_tables
+
+loader = load_workbook_pandas if {engine!r} == "pandas" else load_workbook_tables
+con = duckdb.connect(database=":memory:")
+start = time.perf_counter()
+tables = loader(con, {workbook!r}, "data")
+elapsed = time.perf_counter() - start
+rows = {{t: con.execute(f'SELECT count(*) FROM "{{t}}"').fetchone()[0] for t, _ in tables}}
+print(json.dumps({{
+    "elapsed": elapsed,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "rows": rows,
+}}))
+"""
+
+
+def write_workbook(path: Path, rows: int):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sales = workbook.create_sheet("Sales")
+    sales.append(["order_id", "region", "product", "quantity", "unit_price", "order_date", "note"])
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(rows):
+        sales.append([
+            i, f"R{i % 12}", f"product-{i % 500}", i % 40 + 1, round(1.5 + (i % 997) * 0.25, 2),
+            start + datetime.timedelta(minutes=i), "bulk" if i % 7 == 0 else None,
+        ])
+    regions = workbook.create_sheet("Regions")
+    regions.append(["region", "manager"])
+    for i in range(12):
+        regions.append([f"R{i}", f"manager-{i}"])
+    workbook.save(path)
+
+
+def run_engine(engine: str, workbook: Path):
+    proc = subprocess.run(
+        [sys.executable, "-c", RUNNER.format(root=str(PROJECT_ROOT), engine=engine, workbook=str(workbook))],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{engine} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="rows in the generated Sales sheet")
+    parser.add_argument("--workbook", type=Path, default=None, help="use an existing .xlsx instead")
+    parser.add_argument("--engine", nargs="+", choices=ENGINES, default=ENGINES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = args.workbook
+        if workbook is None:
+            workbook = Path(tmp) / "bench.xlsx"
+            write_workbook(workbook, args.rows)
+        size_mb = workbook.stat().st_size / 1024 / 1024
+        print(f"workbook: {workbook.name} ({size_mb:.1f} MB)")
+
+        for engine in args.engine:
+            result = run_engine(engine, workbook)
+            tables = ", ".join(f"{name}={count}" for name, count in result["rows"].items())
+            print(f"{engine:<9} {result['elapsed']:7.2f} s   peak RSS {result['peak_rss_mb']:8.1f} MB   {tables}")
+
+
+if __name__ == "__main__":
+    main()
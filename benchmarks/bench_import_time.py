@@ -0,0 +1,97 @@
+"""
+Cold import time of the service entry points, from `python -X importtime`.
+
+Each module is imported in a fresh interpreter with `-X importtime`; the
+per-module cumulative times printed on stderr are parsed to report the total
+and the heaviest imports. Modules that must stay off a path (e.g. Streamlit
+for the API) are checked too, so the script doubles as a regression gate:
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --module main --max-ms 1500 --forbid streamlit duckdb pandas
+
+Exits non-zero when an import exceeds `--max-ms` or pulls in a forbidden module.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Keep benchmark runs out of the tracked logs/app.log (child processes inherit it)
+os.environ.setdefault("APP_LOG_FILE", "")
+
+DEFAULT_MODULES = ["src.llm.tools", "src.llm.agent_inference", "main", "app"]
+DEFAULT_FORBIDDEN = ["streamlit", "duckdb", "pandas", "langchain_tavily", "mistralai"]
+
+LINE_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str, repeat: int = 1):
+    """
+    `{module_name: (self_us, cumulative_us)}` for one cold import of
+    `module` (best of `repeat` runs, to dampen filesystem-cache noise).
+    """
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+
+        profile = {}
+        for line in proc.stderr.splitlines():
+            match = LINE_PATTERN.match(line)
+            if match:
+                self_us, cumulative, _, name = match.groups()
+                profile[name] = (int(self_us), int(cumulative))
+        if best is None or profile.get(module, (0, 0))[1] < best.get(module, (0, 0))[1]:
+            best = profile
+    return best
+
+
+def top_level(profile: dict):
+    """Time spent per top-level package (e.g. `pandas`): sum of its modules' self times."""
+    packages = {}
+    for name, (self_us, _) in profile.items():
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN,
+                        help="top-level packages that must not be imported")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail when an import takes longer")
+    parser.add_argument("--top", type=int, default=10, help="heaviest packages to list")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.module:
+        profile = import_profile(module, args.repeat)
+        total_ms = profile.get(module, (0, 0))[1] / 1000
+        packages = top_level(profile)
+        print(f"{module}: {total_ms:.1f} ms")
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        for name, spent in heaviest[:args.top]:
+            print(f"    {spent / 1000:8.1f} ms  {name}")
+
+        forbidden = sorted(set(args.forbid) & set(packages))
+        if forbidden:
+            failures.append(f"{module} imports {', '.join(forbidden)}")
+        if args.max_ms is not None and total_ms > args.max_ms:
+            failures.append(f"{module} took {total_ms:.1f} ms (> {args.max_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Sequential vs process-pool PDF chunk extraction.
+
+Generates a text-heavy PDF (default 400 pages), then times
+`TextProcessor.iter_chunks` with `workers=0` and with `workers=N`, and checks
+that both modes produce identical ids and text in the same order.
+
+    python benchmarks/bench_pdf_parallel.py --pages 400 --workers 16
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+# Keep benchmark runs out of the tracked logs/app.log (child processes inherit it)
+os.environ.setdefault("APP_LOG_FILE", "")
+
+WORDS = (
+    "policy coverage claim premium agent model document retrieval vector index "
+    "latency throughput request response page chunk token embedding query answer"
+).split()
+
+
+def _pdf_text(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 60, seed: int = 7):
+    """Write a minimal multi-page PDF with Helvetica text and no dependencies."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for _ in range(pages):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(14)) + "." for _ in range(lines_per_page)]
+        stream = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({_pdf_text(l)}) Tj T*" for l in lines) + " ET"
+        stream = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pages-per-shard", type=int, default=16)
+    args = parser.parse_args()
+
+    from src.utils.pdf_processor import TextProcessor, get_process_pool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "bench.pdf")
+        write_pdf(pdf_path, args.pages)
+        print(f"generated {args.pages} pages ({os.path.getsize(pdf_path) / 1e6:.1f} MB)")
+
+        processor = TextProcessor(pages_per_shard=args.pages_per_shard, use_cache=False)
+        # Start the workers up front so the timing reflects steady state.
+        get_process_pool(args.workers).submit(int).result()
+
+        results = {}
+        for name, workers in (("sequential", 0), (f"parallel x{args.workers}", args.workers)):
+            start = time.perf_counter()
+            results[name] = list(processor.iter_chunks(pdf_path, "bench", workers=workers))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<14} {elapsed:7.2f}s  {args.pages / elapsed:7.1f} pages/s  {len(results[name])} chunks")
+
+        sequential, parallel = results.values()
+        assert sequential == parallel, "parallel extraction changed ids or order"
+        print("ids and order identical")
+
+
+if __name__ == "__main__":
+    main()
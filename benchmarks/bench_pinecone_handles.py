@@ -0,0 +1,66 @@
+"""
+Per-request Pinecone overhead: fresh client per request vs shared handle.
+
+"before" replays what `/upload-doc` used to do on every request (new
+`Pinecone` client, `has_index`, `describe_index` readiness poll, `Index`
+lookup) followed by one data-plane call. "after" uses the process-wide
+handle from `src.llm.indexing.get_index` for the same data-plane call.
+
+    python benchmarks/bench_pinecone_handles.py --requests 200 --latency 0.02
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+# Keep benchmark runs out of the tracked logs/app.log (child processes inherit it)
+os.environ.setdefault("APP_LOG_FILE", "")
+
+from benchmarks.fake_pinecone import FakePineconeServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub latency per HTTP call in seconds")
+    args = parser.parse_args()
+
+    with FakePineconeServer(latency=args.latency) as server:
+        # Point the shared client at the stub before the config is read.
+        os.environ["PINECONE_HOST"] = server.url
+
+        from pinecone import Pinecone
+        from src.llm import indexing
+
+        index_name = indexing.index_cfg.get("index_name", "index1")
+        api_key = indexing.cfg["keys"]["pinecone_key"]
+
+        def before():
+            pc = Pinecone(api_key=api_key, host=server.url)
+            pc.has_index(index_name)
+            while not pc.describe_index(index_name).status["ready"]:
+                time.sleep(2)
+            pc.Index(host=pc.describe_index(index_name).host).describe_index_stats()
+
+        def after():
+            indexing.get_index(index_name).describe_index_stats()
+
+        for name, request in (("before", before), ("after", after)):
+            indexing.reset_index_handles()
+            calls_before = server.state.requests
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                request()
+            elapsed = time.perf_counter() - start
+            calls = server.state.requests - calls_before
+            print(
+                f"{name:<7} {elapsed / args.requests * 1000:8.2f} ms/request "
+                f"{calls / args.requests:5.2f} HTTP calls/request"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Per-rerun latency of the Streamlit app, with and without the resource cache.
+
+Drives `streamlit.py` headlessly with Streamlit's `AppTest` and times each
+rerun (the work done on every widget interaction). The `uncached` run
+clears `st.cache_resource` before every rerun, which reproduces the old
+behaviour of rebuilding `CreateAgent`, `Tools` and the Mistral clients each
+time; the `cached` run only pays for that on the first rerun.
+
+Needs the real config (Mistral keys); no chat message is sent, so no model
+calls are made.
+
+    python benchmarks/bench_streamlit_rerun.py --reruns 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+# Keep benchmark runs out of the tracked logs/app.log (child processes inherit it)
+os.environ.setdefault("APP_LOG_FILE", "")
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP = PROJECT_ROOT / "streamlit.py"
+
+
+def time_reruns(reruns: int, cached: bool, timeout: float):
+    st.cache_resource.clear()
+    app = AppTest.from_file(str(APP), default_timeout=timeout)
+    timings = []
+    for _ in range(reruns):
+        if not cached:
+            st.cache_resource.clear()
+        start = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+    return timings
+
+
+def report(label: str, timings):
+    warm = timings[1:] or timings
+    print(
+        f"{label:<9} first {timings[0]:8.1f} ms   "
+        f"median {statistics.median(warm):8.1f} ms   "
+        f"p95 {sorted(warm)[int(0.95 * (len(warm) - 1))]:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    args = parser.parse_args()
+
+    uncached = time_reruns(args.reruns, cached=False, timeout=args.timeout)
+    cached = time_reruns(args.reruns, cached=True, timeout=args.timeout)
+    report("uncached", uncached)
+    report("cached", cached)
+    speedup = statistics.median(uncached[1:] or uncached) / statistics.median(cached[1:] or cached)
+    print(f"warm rerun speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Local vector store: IVF approximate search vs exact brute force.
+
+Builds an `n x dim` float32 matrix of clustered unit vectors (memory-mapped
+in a temp dir, like `LocalStore`), trains an `IVFIndex` and reports
+queries/sec for both search modes plus IVF recall@k against brute force.
+
+    python benchmarks/bench_vector_store.py --n 1000000 --dim 384 --nprobe 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+# Keep benchmark runs out of the tracked logs/app.log (child processes inherit it)
+os.environ.setdefault("APP_LOG_FILE", "")
+
+from src.llm.vector_store import IVFIndex, brute_force_search
+
+
+def clustered_vectors(path, n, dim, clusters, seed=0, block=100_000):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    matrix = np.memmap(path, dtype=np.float32, mode="w+", shape=(n, dim))
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        rows = centers[rng.integers(0, clusters, stop - start)]
+        rows = rows + 0.6 * rng.standard_normal(rows.shape).astype(np.float32)
+        matrix[start:stop] = rows / np.linalg.norm(rows, axis=1, keepdims=True)
+    matrix.flush()
+    return matrix, centers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0, help="0 = 4 * sqrt(n)")
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        matrix, centers = clustered_vectors(os.path.join(tmp, "vectors.f32"), args.n, args.dim, clusters=256)
+        alive = np.ones(args.n, dtype=bool)
+        print(f"built {args.n} x {args.dim} matrix in {time.perf_counter() - start:.1f}s")
+
+        rng = np.random.default_rng(1)
+        queries = centers[rng.integers(0, len(centers), args.queries)]
+        queries = queries + 0.6 * rng.standard_normal(queries.shape).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        start = time.perf_counter()
+        ivf = IVFIndex(nlist=args.nlist or int(4 * np.sqrt(args.n)), nprobe=args.nprobe)
+        ivf.train(matrix)
+        print(f"trained IVF (nlist={ivf.nlist}) in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        exact = [set(brute_force_search(matrix, alive, q, args.k)[0].tolist()) for q in queries]
+        brute_qps = args.queries / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        approx = [set(ivf.search(matrix, alive, q, args.k)[0].tolist()) for q in queries]
+        ivf_qps = args.queries / (time.perf_counter() - start)
+
+        recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+        print(f"brute force  {brute_qps:9.1f} queries/s  recall@{args.k} 1.000")
+        print(f"ivf nprobe={args.nprobe:<3}{ivf_qps:9.1f} queries/s  recall@{args.k} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Minimal stand-in for the Pinecone control and data plane APIs.
+
+Only the calls made by `src/llm/indexing.py` are implemented. The same
+server acts as control plane (`/indexes...`) and as the index host
+(`/describe_index_stats`, `/records/...`, `/vectors/...`), answering in
+the shapes of the pinned SDK (pinecone 10.x). Every request sleeps
+`latency` seconds to mimic a network round-trip.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+
+class PineconeState:
+    def __init__(self, index_name: str):
+        self.index_name = index_name
+        self.records = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+
+def make_handler(state: PineconeState, latency: float, base_url: callable):
+    class FakePineconeHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, payload, status=200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return self.rfile.read(length) if length else b""
+
+        def _describe(self):
+            # Index model as returned by the API version of the pinned SDK (pinecone 10.x)
+            return {
+                "name": state.index_name,
+                "host": base_url(),
+                "status": {"ready": True, "state": "Ready"},
+                "schema": {
+                    "fields": {
+                        "chunk_text": {"type": "semantic_text", "model": "llama-text-embed-v2", "metric": "cosine"},
+                    },
+                },
+                "deployment": {"deployment_type": "managed", "cloud": "aws", "region": "us-east-1"},
+                "deletion_protection": "disabled",
+            }
+
+        def _stats(self):
+            with state.lock:
+                count = len(state.records)
+            return {
+                "namespaces": {"namespace1": {"vectorCount": count}},
+                "dimension": 1024,
+                "indexFullness": 0.0,
+                "totalVectorCount": count,
+            }
+
+        def _route(self, method):
+            time.sleep(latency)
+            with state.lock:
+                state.requests += 1
+            path = self.path.split("?")[0]
+            body = self._body()
+
+            if method == "GET" and path == "/indexes":
+                return self._send({"indexes": [self._describe()]})
+            if method == "GET" and path == f"/indexes/{state.index_name}":
+                return self._send(self._describe())
+            if path == "/describe_index_stats":
+                return self._send(self._stats())
+            if method == "POST" and re.fullmatch(r"/records/namespaces/[^/]+/upsert", path):
+                with state.lock:
+                    for line in body.decode().splitlines():
+                        if line.strip():
+                            record = json.loads(line)
+                            state.records[record.get("_id") or record.get("id")] = record
+                return self._send({}, status=201)
+            if method == "POST" and path == "/vectors/delete":
+                payload = json.loads(body or b"{}")
+                with state.lock:
+                    if payload.get("deleteAll"):
+                        state.records.clear()
+                    for record_id in payload.get("ids") or []:
+                        state.records.pop(record_id, None)
+                return self._send({})
+            if method == "GET" and path == "/vectors/list":
+                prefix = re.search(r"prefix=([^&]*)", self.path)
+                prefix = unquote(prefix.group(1)) if prefix else ""
+                with state.lock:
+                    ids = sorted(i for i in state.records if i.startswith(prefix))
+                return self._send({"vectors": [{"id": i} for i in ids], "namespace": "namespace1"})
+            if method == "GET" and path == "/vectors/fetch":
+                ids = re.findall(r"ids=([^&]+)", self.path)
+                with state.lock:
+                    found = {i: {"id": i, "values": [0.0]} for i in ids if i in state.records}
+                return self._send({"vectors": found, "namespace": "namespace1"})
+            return self._send({"error": {"code": "NOT_FOUND", "message": path}}, status=404)
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def do_DELETE(self):
+            self._route("DELETE")
+
+        def log_message(self, *args):
+            pass
+
+    return FakePineconeHandler
+
+
+class FakePineconeServer:
+    def __init__(self, index_name: str = "index1", latency: float = 0.02, host: str = "127.0.0.1", port: int = 0):
+        self.state = PineconeState(index_name)
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.state, latency, lambda: self.url))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -1,4 +1,5 @@
 from pathlib import Path
+import hashlib
 import yaml
 import os
 
@@ -8,6 +9,13 @@ SECRETS_FILE = CONFIG_DIR / "secrets.yml"
 
 _config = None
 
+# Environment variables the SDKs read, and the `keys` entry each comes from
+ENV_KEYS = {
+    "MISTRAL_API_KEY": "mistral_api_key",
+    "LANGSMITH_API_KEY": "langsmith_api_key",
+    "TAVILY_API_KEY": "tavily_api_key",
+}
+
 def _load_yaml(path: Path):
     if not path.exists():
         return {}
@@ -19,6 +27,46 @@ def get_config():
     if _config is not None:
         return _config
 
+    _config = _load_config()
+    return _config
+
+def export_env(config=None):
+    """Publish API keys from the `keys` section as the env vars SDKs read."""
+    keys = (config or get_config()).get("keys") or {}
+    for env_name, key in ENV_KEYS.items():
+        if keys.get(key):
+            os.environ[env_name] = keys[key]
+
+def reload_config():
+    """
+    Re-read the config files into the existing dict. Sections are updated in
+    place, so modules holding `cfg` or a section (e.g. `index_cfg`) see the
+    new values, and API key env vars are exported again; constants derived
+    at import time keep their old ones.
+    """
+    config = get_config()
+    fresh = _load_config()
+    for name in list(config):
+        if name not in fresh:
+            del config[name]
+    for name, section in fresh.items():
+        if isinstance(config.get(name), dict) and isinstance(section, dict):
+            config[name].clear()
+            config[name].update(section)
+        else:
+            config[name] = section
+    export_env(config)
+    return config
+
+def config_fingerprint() -> str:
+    """Short hash of the config files' contents, for cache invalidation."""
+    digest = hashlib.sha256()
+    for path in (MODEL_CONFIG_FILE, SECRETS_FILE):
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+def _load_config():
     config = {}
 
     # Load model config
@@ -36,5 +84,4 @@ def get_config():
                 if isinstance(v, str) and v.startswith("${") and v.endswith("}"):
                     section[k] = os.getenv(v[2:-1])
 
-    _config = config
     return config
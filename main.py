@@ -1,18 +1,30 @@
 from pydantic import BaseModel
 from typing import Optional
 import os
-from pathlib import Path
+import json
+import uuid
+import asyncio
 import tempfile
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from pathlib import Path
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from config import get_config
 from src.utils.pdf_processor import TextProcessor
 from src.llm.indexing import Indexing
 from src.llm.agent_inference import CreateAgent
+from src.llm.hooks import MetricsHooks
+from src.utils.attachment import Attachment
+from src.utils.query_results import (
+    EXPORT_FORMATS, ResultQueryError, export_result, fetch_page, get_result_store, materialize_result
+)
 
 app = FastAPI(title="Chatbot")
 
 os.environ["LANGSMITH_TRACING"] = "true"
 
 agent = CreateAgent()  # 🔥 Initialize agent once
+sql_cfg = get_config().get("sql", {})
 
 
 from pathlib import Path
@@ -34,28 +46,45 @@ def detect_attachment_type(file: UploadFile) -> str:
 
 
 
-async def save_temp_file(file: UploadFile) -> str:
-    suffix = Path(file.filename).suffix
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(await file.read())
-        return tmp.name
+def attachment_file_args(attachment_type: str, attachment: Attachment) -> dict:
+    if attachment_type == "pdf":
+        return {"pdf_path": attachment.uri, "filename": Path(attachment.filename).stem}
+    if attachment_type == "image":
+        return {"image_path": attachment.uri}
+    if attachment_type == "audio":
+        return {"audio_path": attachment.uri}
+    return {}
+
+
+def sse_event(event: dict) -> str:
+    return f"data: {json.dumps(event, default=str)}\n\n"
 
 
 @app.post("/conversation")
 async def conversation(
     query: Optional[str] = Form(None),
-    attachment: Optional[UploadFile] = File(None)
+    attachment: Optional[UploadFile] = File(None),
+    system_prompt_type: str = Form("default"),
+    session_id: Optional[str] = Form(None)
 ):
     if not query:
         raise HTTPException(status_code=400, detail="Query is required")
 
-    temp_path = None
+    # Clients keep sending the returned id to continue the same session
+    session_id = session_id or uuid.uuid4().hex
+    upload = None
 
     try:
         # ---------- NO ATTACHMENT → TEXT ONLY ----------
         if not attachment:
-            response = agent.query_inference(query)
+            response = await agent.aquery_inference(
+                query,
+                system_prompt_type=system_prompt_type,
+                session_id=session_id,
+                hooks=[MetricsHooks()]
+            )
             return {
+                "session_id": session_id,
                 "query": query,
                 "attachment": None,
                 "response": response
@@ -67,31 +96,19 @@ async def conversation(
         if attachment_type == "unknown":
             raise HTTPException(status_code=400, detail="Unsupported attachment type")
 
-        temp_path = await save_temp_file(attachment)
-
-        # ---------- PDF ----------
-        if attachment_type == "pdf":
-            response = agent.pdf_inference(
-                query=query,
-                pdf_path=temp_path,
-                filename=attachment.filename
-            )
-
-        # ---------- IMAGE ----------
-        elif attachment_type == "image":
-            response = agent.image_inference(
-                query=query,
-                image_path=temp_path
-            )
+        upload = await Attachment.from_upload(attachment)
 
-        # ---------- AUDIO ----------
-        elif attachment_type == "audio":
-            response = agent.audio_inference(
-                query=query,
-                audio_path=temp_path
-            )
+        # ---------- PDF / IMAGE / AUDIO ----------
+        response = await agent.aquery_inference(
+            query,
+            system_prompt_type=system_prompt_type,
+            session_id=session_id,
+            hooks=[MetricsHooks()],
+            **attachment_file_args(attachment_type, upload)
+        )
 
         return {
+            "session_id": session_id,
             "query": query,
             "attachment": {
                 "filename": attachment.filename,
@@ -101,5 +118,132 @@ async def conversation(
         }
 
     finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+        if upload:
+            upload.close()
+
+
+@app.post("/conversation/stream")
+async def conversation_stream(
+    query: Optional[str] = Form(None),
+    attachment: Optional[UploadFile] = File(None),
+    system_prompt_type: str = Form("default"),
+    session_id: Optional[str] = Form(None)
+):
+    """
+    Same contract as `/conversation`, but answers with Server-Sent Events:
+    a `session` event with the session id, then tool calls/results and model
+    tokens as they are produced, ending with a `final` event carrying the
+    full answer.
+    """
+    if not query:
+        raise HTTPException(status_code=400, detail="Query is required")
+
+    session_id = session_id or uuid.uuid4().hex
+
+    file_args = {}
+    upload = None
+
+    if attachment:
+        attachment_type = detect_attachment_type(attachment)
+
+        if attachment_type == "unknown":
+            raise HTTPException(status_code=400, detail="Unsupported attachment type")
+
+        upload = await Attachment.from_upload(attachment)
+        file_args = attachment_file_args(attachment_type, upload)
+
+    async def event_source():
+        try:
+            yield sse_event({"type": "session", "session_id": session_id})
+            async for event in agent.astream_inference(
+                query,
+                system_prompt_type=system_prompt_type,
+                session_id=session_id,
+                hooks=[MetricsHooks()],
+                **file_args
+            ):
+                yield sse_event(event)
+        except Exception as e:
+            yield sse_event({"type": "error", "content": str(e)})
+        finally:
+            # The attachment must outlive the request handler, so it is
+            # released once the stream is exhausted (or the client leaves).
+            if upload:
+                upload.close()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def get_result_entry(result_id: str) -> dict:
+    entry = get_result_store(sql_cfg).get(result_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Result not found or expired")
+    return entry
+
+
+@app.get("/results/{result_id}")
+async def result_page(
+    result_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1)
+):
+    """
+    Page through the full result of a `sql_user_query_tool` call; the agent
+    only sees the first rows. Follow `next_offset` until it is null.
+    """
+    entry = get_result_entry(result_id)
+    limit = min(limit, int(sql_cfg.get("result_page_max_rows", 10000)))
+    try:
+        page = await asyncio.to_thread(fetch_page, entry, offset, limit, sql_cfg)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ResultQueryError as e:
+        raise HTTPException(status_code=400, detail=f"Result cannot be paged: {e}")
+    return {"result_id": result_id, "limit": limit, **page}
+
+
+@app.get("/results/{result_id}/download")
+async def download_result(
+    result_id: str,
+    format: str = Query("parquet", description="parquet or csv")
+):
+    """Full result of a `sql_user_query_tool` call as a Parquet or CSV file."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be parquet or csv")
+    entry = get_result_entry(result_id)
+
+    if format == "parquet":
+        # The Parquet file pages are read from is the download itself
+        try:
+            path = await asyncio.to_thread(materialize_result, entry, sql_cfg)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=410, detail=str(e))
+        except ResultQueryError as e:
+            raise HTTPException(status_code=400, detail=f"Result cannot be exported: {e}")
+        return FileResponse(path, media_type=EXPORT_FORMATS[format][1], filename=f"{result_id}.{format}")
+
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    os.close(fd)
+    try:
+        await asyncio.to_thread(export_result, entry, format, path, sql_cfg)
+    except FileNotFoundError as e:
+        os.remove(path)
+        raise HTTPException(status_code=410, detail=str(e))
+    except ResultQueryError as e:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail=f"Result cannot be exported: {e}")
+    except Exception:
+        os.remove(path)
+        raise
+
+    # The temp file is removed once the response has been sent
+    return FileResponse(
+        path,
+        media_type=EXPORT_FORMATS[format][1],
+        filename=f"{result_id}.{format}",
+        background=BackgroundTask(os.remove, path)
+    )
@@ -1,34 +1,87 @@
 import sys
 from pathlib import Path
-import  streamlit as st
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
 from langchain_mistralai import ChatMistralAI
 from langchain.agents import create_agent
 from src.llm.tools import Tools
-from langchain.messages import HumanMessage,SystemMessage
+from langchain.messages import HumanMessage,SystemMessage,AIMessage,AIMessageChunk,ToolMessage
 from src.prompts import get_prompt
+from src.llm.hooks import call_hooks, dispatch_event
+from src.utils.log import AppLogger
 
-from config import get_config
+from config import export_env, get_config
 import os
 
 cfg=get_config()
-os.environ["MISTRAL_API_KEY"]=cfg["keys"]["mistral_api_key"]
-os.environ["LANGSMITH_API_KEY"] = cfg["keys"]["langsmith_api_key"]
+export_env(cfg)   # MISTRAL_API_KEY, LANGSMITH_API_KEY, ...; reload_config() re-exports
 os.environ["LANGSMITH_TRACING"] = "true"
+logger = AppLogger.setup()
+
+STREAM_MODES = ["updates", "messages"]
+
+
+def message_text(content):
+    """Flatten LangChain message content (str or list of parts) to text."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content or []
+    )
+
+
+def stream_events(mode, chunk):
+    """
+    Translate one LangGraph stream item into UI/API friendly events:
+
+    - {"type": "token", "content": ...}          model token as generated
+    - {"type": "tool_call", "name": ..., "args": ...}
+    - {"type": "tool_result", "name": ..., "content": ...}
+    - {"type": "final", "content": ...}          final assistant answer
+    """
+    if mode == "messages":
+        message, metadata = chunk
+        if metadata.get("langgraph_node") == "model" and isinstance(message, AIMessageChunk):
+            text = message_text(message.content)
+            if text:
+                yield {"type": "token", "content": text}
+        return
+
+    for update in chunk.values():
+        for message in (update or {}).get("messages", []):
+            if isinstance(message, AIMessage):
+                if message.tool_calls:
+                    for call in message.tool_calls:
+                        yield {"type": "tool_call", "name": call["name"], "args": call["args"]}
+                else:
+                    yield {"type": "final", "content": message_text(message.content)}
+            elif isinstance(message, ToolMessage):
+                yield {"type": "tool_result", "name": message.name, "content": message_text(message.content)}
+
+
+def session_config(session_id=None) -> dict:
+    """Run config that lets session-aware tools find their per-session state."""
+    return {"configurable": {"session_id": session_id}} if session_id else {}
+
 
 class CreateAgent:
-    def __init__(self):
+    """
+    UI-agnostic agent runner. Observers subscribe through `InferenceHooks`:
+    `hooks` given here apply to every run, `hooks=` on a call to that run.
+    """
+
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks or [])
         self.tools = Tools().__call__()
         self.model = ChatMistralAI(
             model=cfg["models"]["mistral_chat_model"], temperature=0, max_retries=1
         )
         self.agent = create_agent(model=self.model, tools=self.tools)
 
-    def query_inference(self, query,system_prompt_type, image_path=None, audio_path=None, pdf_path=None, csv_path=None, xlsx_path=None, table_name=None,  filename=None):
+    def build_messages(self, query, system_prompt_type="default", image_path=None, audio_path=None, pdf_path=None, csv_path=None, xlsx_path=None, table_name=None,  filename=None):
         system_prompt = get_prompt(system_prompt_type.lower())  # or "friendly" / "expert"
-        st.toast("Inference Started!",icon="🎉")
         messages = [SystemMessage(content=system_prompt)]
 
         if image_path:
@@ -42,14 +95,106 @@ class CreateAgent:
             messages.append(HumanMessage(content=file_info))
         if csv_path:
             file_info = f"CSV Path: {csv_path} and Table Name: {table_name}"
-            print(file_info)
+            logger.info(file_info)
             messages.append(HumanMessage(content=file_info))
         if xlsx_path:
             file_info = f"Excel Path: {xlsx_path} and Table Name: {table_name}"
-            print(file_info)
+            logger.info(file_info)
             messages.append(HumanMessage(content=file_info))
 
         messages.append(HumanMessage(content=query))
+        return messages
+
+    def _hooks(self, hooks):
+        return [*self.hooks, *(hooks or [])]
+
+    def _events(self, messages, config, stream_modes, hooks):
+        """Run the graph, yielding `stream_events` and feeding them to `hooks`."""
+        for mode, chunk in self.agent.stream({"messages": messages}, config=config, stream_mode=stream_modes):
+            for event in stream_events(mode, chunk):
+                dispatch_event(hooks, event)
+                yield event
+
+    async def _aevents(self, messages, config, stream_modes, hooks):
+        async for mode, chunk in self.agent.astream({"messages": messages}, config=config, stream_mode=stream_modes):
+            for event in stream_events(mode, chunk):
+                dispatch_event(hooks, event)
+                yield event
+
+    def query_inference(self, query, system_prompt_type="default", session_id=None, hooks=None, **file_args):
+        """
+        Run the agent and return the final answer. Runs on graph updates
+        (no token stream), so `hooks` see start, tool calls/results and
+        finish but no `on_token`.
+        """
+        hooks = self._hooks(hooks)
+        messages = self.build_messages(query, system_prompt_type, **file_args)
+        call_hooks(hooks, "on_start", query, session_id)
+
+        response = ""
+        try:
+            for event in self._events(messages, session_config(session_id), ["updates"], hooks):
+                if event["type"] == "final":
+                    response = event["content"]
+        except Exception as e:
+            call_hooks(hooks, "on_error", e)
+            raise
+        call_hooks(hooks, "on_finish", response)
+        return response
+
+    async def aquery_inference(self, query, system_prompt_type="default", session_id=None, hooks=None, **file_args):
+        """
+        Non-blocking variant of `query_inference` for async callers (FastAPI).
+
+        The agent graph runs with `astream`, so model calls and the Mistral
+        backed tools are awaited on the event loop instead of blocking it.
+        `session_id` scopes tool-side state (the multimodal conversation).
+        """
+        hooks = self._hooks(hooks)
+        messages = self.build_messages(query, system_prompt_type, **file_args)
+        call_hooks(hooks, "on_start", query, session_id)
+
+        response = ""
+        try:
+            async for event in self._aevents(messages, session_config(session_id), ["updates"], hooks):
+                if event["type"] == "final":
+                    response = event["content"]
+        except Exception as e:
+            call_hooks(hooks, "on_error", e)
+            raise
+        call_hooks(hooks, "on_finish", response)
+        return response
+
+    def stream_inference(self, query, system_prompt_type="default", session_id=None, hooks=None, **file_args):
+        """Yield `stream_events` while the agent runs (blocking generator)."""
+        hooks = self._hooks(hooks)
+        messages = self.build_messages(query, system_prompt_type, **file_args)
+        call_hooks(hooks, "on_start", query, session_id)
+
+        response = ""
+        try:
+            for event in self._events(messages, session_config(session_id), STREAM_MODES, hooks):
+                if event["type"] == "final":
+                    response = event["content"]
+                yield event
+        except Exception as e:
+            call_hooks(hooks, "on_error", e)
+            raise
+        call_hooks(hooks, "on_finish", response)
+
+    async def astream_inference(self, query, system_prompt_type="default", session_id=None, hooks=None, **file_args):
+        """Async counterpart of `stream_inference` for the FastAPI app."""
+        hooks = self._hooks(hooks)
+        messages = self.build_messages(query, system_prompt_type, **file_args)
+        call_hooks(hooks, "on_start", query, session_id)
 
-        response = self.agent.invoke({"messages": messages})
-        return response["messages"][-1].content
+        response = ""
+        try:
+            async for event in self._aevents(messages, session_config(session_id), STREAM_MODES, hooks):
+                if event["type"] == "final":
+                    response = event["content"]
+                yield event
+        except Exception as e:
+            call_hooks(hooks, "on_error", e)
+            raise
+        call_hooks(hooks, "on_finish", response)
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from src.utils.log import AppLogger
+from config import get_config
+
+cfg = get_config()
+agents_cfg = cfg.get("agents", {})
+logger = AppLogger.setup()
+
+
+def definition_hash(definition: dict, api_key: str = "") -> str:
+    """
+    Stable hash of an agent definition. The API key's fingerprint is mixed
+    in because agent ids are only valid inside the workspace that made them.
+    """
+    payload = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    key_fingerprint = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return hashlib.sha256(f"{key_fingerprint}:{payload}".encode("utf-8")).hexdigest()
+
+
+class AgentRegistry:
+    """
+    Local JSON file mapping `definition_hash -> Mistral agent id`.
+
+    `beta.agents.create` is a remote write that leaves a new agent behind on
+    every call; looking the definition up here first means a process start
+    only creates an agent when its definition actually changed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, entries: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def get(self, key: str):
+        entry = self._read().get(key)
+        return entry["agent_id"] if entry else None
+
+    def put(self, key: str, agent_id: str, name: str = None):
+        with self._lock:
+            entries = self._read()
+            entries[key] = {"agent_id": agent_id, "name": name, "created_at": time.time()}
+            self._write(entries)
+
+    def forget(self, key: str):
+        with self._lock:
+            entries = self._read()
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+
+    def get_or_create(self, client, definition: dict, api_key: str = "", refresh: bool = False) -> str:
+        """Agent id for `definition`, creating (and recording) it only when unknown."""
+        key = definition_hash(definition, api_key)
+        agent_id = None if refresh else self.get(key)
+        if agent_id:
+            return agent_id
+
+        agent = client.beta.agents.create(**definition)
+        logger.info(f"created Mistral agent {definition.get('name')!r}: {agent.id}")
+        self.put(key, agent.id, definition.get("name"))
+        return agent.id
+
+
+_agent_registry = None
+_agent_registry_lock = threading.Lock()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Process-wide registry built from the `agents` config section."""
+    global _agent_registry
+    if _agent_registry is None:
+        with _agent_registry_lock:
+            if _agent_registry is None:
+                path = Path(agents_cfg.get("registry_path", ".cache/mistral_agents.json"))
+                if not path.is_absolute():
+                    path = PROJECT_ROOT / path
+                _agent_registry = AgentRegistry(path)
+    return _agent_registry
@@ -0,0 +1,181 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import argparse
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as wait_futures, FIRST_COMPLETED
+
+from src.utils.pdf_processor import TextProcessor
+from src.utils.log import AppLogger
+from src.llm.indexing import Indexing, IndexJob
+
+logger = AppLogger.setup()
+
+PDF_SUFFIX = ".pdf"
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+def is_archive(name) -> bool:
+    return str(name).lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def iter_archive_pdfs(archive, extract_dir):
+    """
+    Extract the PDFs of a zip/tar archive one by one into `extract_dir`,
+    yielding `(document_name, path)`. Members are streamed, never loaded
+    whole; the document name is the member path.
+    """
+    extract_dir = Path(extract_dir)
+    extract_dir.mkdir(parents=True, exist_ok=True)
+
+    def target():
+        fd, path = tempfile.mkstemp(suffix=PDF_SUFFIX, dir=extract_dir)
+        os.close(fd)
+        return Path(path)
+
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            for member in zf.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(PDF_SUFFIX):
+                    continue
+                path = target()
+                with zf.open(member) as src, open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                yield member.filename, path
+        return
+
+    with tarfile.open(archive, "r:*") as tf:
+        for member in tf:
+            if not member.isfile() or not member.name.lower().endswith(PDF_SUFFIX):
+                continue
+            path = target()
+            with tf.extractfile(member) as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            yield member.name, path
+
+
+def iter_pdf_sources(sources, extract_dir):
+    """
+    Expand files, directories and archives into `(document_name, path, owned)`.
+
+    Directory PDFs are named by their path relative to the directory, so
+    same-named files in different folders stay distinct. `owned` is True for
+    files extracted into `extract_dir` (the caller removes them when done).
+    """
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            for path in sorted(source.rglob("*")):
+                if path.is_file() and path.suffix.lower() == PDF_SUFFIX:
+                    yield path.relative_to(source).as_posix(), path, False
+        elif is_archive(source.name):
+            for name, path in iter_archive_pdfs(source, extract_dir):
+                yield name, path, True
+        elif source.suffix.lower() == PDF_SUFFIX:
+            yield source.name, source, False
+        else:
+            logger.warning(f"skipping {source}: not a PDF, archive or directory")
+
+
+def ingest_many(indexing: Indexing, sources, concurrency: int = 4, wait: bool = True, timeout: float = None):
+    """
+    Index every PDF found in `sources` with `concurrency` documents in
+    flight. Each document still batches its own upserts, so extraction of
+    one document overlaps the upserts of others. Visibility is checked once
+    for the whole run at the end instead of per document.
+
+    Returns per-document results plus aggregate throughput.
+    """
+    results, failed, pending_ids = [], [], []
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="bulk-ingest-") as extract_dir:
+        def ingest(name, path, owned):
+            try:
+                # The job itself carries the ids; the tracked-job registry may evict it
+                job = indexing.insert_job(file_path=str(path), file_name=name)
+                return job.to_dict(), job.ids
+            finally:
+                if owned:
+                    Path(path).unlink(missing_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures, pending = {}, set()
+            for name, path, owned in iter_pdf_sources(sources, extract_dir):
+                future = pool.submit(ingest, name, path, owned)
+                futures[future] = name
+                pending.add(future)
+                # Bound the extracted-but-not-ingested backlog for big archives
+                if len(pending) >= 2 * concurrency:
+                    _, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    result, ids = future.result()
+                except Exception as e:
+                    logger.error(f"{name}: ingestion failed: {e}")
+                    failed.append({"document_name": name, "error": str(e)})
+                    continue
+                results.append(result)
+                pending_ids.extend(ids)
+
+    ingest_seconds = time.perf_counter() - start
+    visible = None
+    if wait and results:
+        visible = IndexJob(indexing.store, "insert", f"bulk:{len(results)}", pending_ids).wait(timeout)
+    elapsed = time.perf_counter() - start
+
+    chunks = sum(r.get("chunks", r["records"]) for r in results)
+    upserted = sum(r["records"] for r in results)
+    return {
+        "documents": len(results),
+        "failed": failed,
+        "chunks": chunks,
+        "upserted": upserted,
+        "unchanged": chunks - upserted,
+        "ingest_seconds": round(ingest_seconds, 3),
+        "elapsed": round(elapsed, 3),
+        "docs_per_sec": round(len(results) / ingest_seconds, 2) if ingest_seconds else None,
+        "upserts_per_sec": round(upserted / ingest_seconds, 1) if ingest_seconds else None,
+        "visible": visible,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bulk-index PDFs from files, directories and zip/tar archives."
+    )
+    parser.add_argument("sources", nargs="+", help="PDF files, directories (e.g. data/pdfs) or archives")
+    parser.add_argument("--concurrency", type=int, default=4, help="documents ingested at once")
+    parser.add_argument("--backend", default=None, help="vector store backend (defaults to config)")
+    parser.add_argument("--no-wait", action="store_true", help="do not wait for the index to show the records")
+    parser.add_argument("--timeout", type=float, default=None, help="max seconds to wait for visibility")
+    parser.add_argument("--details", action="store_true", help="print per-document results too")
+    args = parser.parse_args(argv)
+
+    summary = ingest_many(
+        Indexing(TextProcessor(), backend=args.backend),
+        args.sources,
+        concurrency=args.concurrency,
+        wait=not args.no_wait,
+        timeout=args.timeout,
+    )
+    if not args.details:
+        summary.pop("results")
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import time
+
+from src.utils.log import AppLogger
+
+logger = AppLogger.setup()
+
+
+class InferenceHooks:
+    """
+    Observer interface for one agent run. Subclass and override what you
+    need; every method is a no-op by default.
+
+    Hooks are called from the thread that consumes the run (the request
+    handler, or the Streamlit script thread), in event order, so UI code can
+    call its own APIs directly. Exceptions raised by a hook are logged and
+    never interrupt inference.
+    """
+
+    def on_start(self, query: str, session_id: str = None):
+        pass
+
+    def on_token(self, text: str):
+        pass
+
+    def on_tool_call(self, name: str, args: dict):
+        pass
+
+    def on_tool_result(self, name: str, content: str):
+        pass
+
+    def on_finish(self, response: str):
+        pass
+
+    def on_error(self, error: Exception):
+        pass
+
+
+class MetricsHooks(InferenceHooks):
+    """Collects latency and tool usage for one run and logs them on finish."""
+
+    def __init__(self):
+        self.started = None
+        self.first_token = None
+        self.tool_calls = []
+        self.metrics = {}
+
+    def on_start(self, query, session_id=None):
+        self.started = time.perf_counter()
+
+    def on_token(self, text):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def on_tool_call(self, name, args):
+        self.tool_calls.append(name)
+
+    def on_finish(self, response):
+        elapsed = time.perf_counter() - self.started
+        self.metrics = {
+            "elapsed": round(elapsed, 3),
+            "time_to_first_token": round(self.first_token - self.started, 3) if self.first_token else None,
+            "tool_calls": self.tool_calls,
+            "response_chars": len(response or ""),
+        }
+        logger.info(f"inference finished: {self.metrics}")
+
+
+EVENT_HOOKS = {
+    "token": lambda hook, event: hook.on_token(event["content"]),
+    "tool_call": lambda hook, event: hook.on_tool_call(event["name"], event["args"]),
+    "tool_result": lambda hook, event: hook.on_tool_result(event["name"], event["content"]),
+}
+
+
+def call_hooks(hooks, method: str, *args):
+    for hook in hooks:
+        try:
+            getattr(hook, method)(*args)
+        except Exception as e:
+            logger.warning(f"{type(hook).__name__}.{method} failed: {e}")
+
+
+def dispatch_event(hooks, event: dict):
+    """Forward one `stream_events` item to the matching hook method."""
+    handler = EVENT_HOOKS.get(event["type"])
+    if handler is None:
+        return
+    for hook in hooks:
+        try:
+            handler(hook, event)
+        except Exception as e:
+            logger.warning(f"{type(hook).__name__} failed on {event['type']}: {e}")
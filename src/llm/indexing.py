@@ -4,76 +4,291 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
+import re
 import time
-from pinecone import Pinecone
+import uuid
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures, FIRST_COMPLETED
+from itertools import islice
 import sys
 from pathlib import Path
 from src.utils.pdf_processor import TextProcessor
+from src.utils.log import AppLogger
+from src.llm.vector_store import VectorStore, get_vector_store, get_index, get_pinecone, reset_index_handles
+from src.llm.manifest import content_hash, get_manifest
 
 from config import get_config
 import os
 
 cfg=get_config()
+index_cfg = cfg.get("indexing", {})
+logger = AppLogger.setup()
+
+BACKEND = index_cfg.get("backend", "pinecone")
+# Pinecone caps integrated-embedding upserts at 96 records per request.
+UPSERT_BATCH_SIZE = index_cfg.get("upsert_batch_size", 96)
+UPSERT_WORKERS = index_cfg.get("upsert_workers", 4)
+UPSERT_MAX_RETRIES = index_cfg.get("upsert_max_retries", 5)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+MAX_TRACKED_JOBS = 1000
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+class IndexJob:
+    """
+    Handle for an index write whose effect becomes visible asynchronously.
+
+    Pinecone is eventually consistent, so instead of sleeping a fixed time
+    the job checks, by id, whether the written records are visible (insert)
+    or gone (delete). `wait` polls with exponential backoff up to a timeout.
+    """
+
+    def __init__(self, store: VectorStore, kind, document_name, ids):
+        self.id = uuid.uuid4().hex
+        self.store = store
+        self.kind = kind
+        self.document_name = document_name
+        self.ids = list(ids)
+        self.created_at = time.time()
+        self.visible_at = None
+        self.stats = {}
+        self._pending = set(self.ids)
+        self._lock = threading.Lock()
+
+        with _jobs_lock:
+            _jobs[self.id] = self
+            while len(_jobs) > MAX_TRACKED_JOBS:
+                _jobs.popitem(last=False)
+
+    @property
+    def visible(self) -> bool:
+        return self.visible_at is not None
+
+    def refresh(self) -> bool:
+        """Check pending ids once; returns True once the write is visible."""
+        with self._lock:
+            if self.visible:
+                return True
+
+            pending = list(self._pending)
+            found = self.store.fetch_ids(pending)
+            self._pending -= found if self.kind == "insert" else set(pending) - found
+
+            if not self._pending:
+                self.visible_at = time.time()
+            return self.visible
+
+    def wait(self, timeout: float = None, initial_delay: float = 0.25, max_delay: float = 4.0) -> bool:
+        """Poll with exponential backoff until visible or `timeout` seconds pass."""
+        timeout = timeout if timeout is not None else index_cfg.get("consistency_timeout", 30)
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        while not self.refresh():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+        return self.visible
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "document_name": self.document_name,
+            "records": len(self.ids),
+            "pending": len(self._pending),
+            "visible": self.visible,
+            "elapsed": round((self.visible_at or time.time()) - self.created_at, 3),
+            **self.stats,
+        }
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def get_job(job_id: str) -> IndexJob:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
 
 class Indexing:
-    def __init__(self,text_processor : TextProcessor):
-        self.pc=Pinecone(api_key=cfg["keys"]["pinecone_key"])
-        self.index_name = "index1"
-        self.namespace="namespace1"
+    def __init__(self,text_processor : TextProcessor, backend=None):
+        self.backend = backend or BACKEND
+        self.index_name = index_cfg.get("index_name", "index1")
+        self.namespace=index_cfg.get("namespace", "namespace1")
         self.doc_processing=text_processor
         self.__call__()
 
     def __call__(self):
-        if not self.pc.has_index (self.index_name):
-            self.pc.create_index_for_model(
-                name=self.index_name,
-                region="us-east-1",
-                cloud="aws",
-                embed={
-                    "model":"llama-text-embed-v2",
-                    "field_map": {
-                        "text":"chunk_text"
-                    }
-                }
-            ) 
-        # Wait for the index to be ready
-        while not self.pc.describe_index(self.index_name).status['ready']:
-            time.sleep(2)
+        # "pinecone" (remote, integrated embedding) or "local" (in-process)
+        self.store = get_vector_store(self.backend, self.index_name, self.namespace)
+        self.manifest = get_manifest(f"{self.backend}/{self.index_name}/{self.namespace}")
 
     
-    def insert_doc(self,file_path, file_name):
-        index = self.pc.Index(self.index_name)
-        records = []
-        docs=self.doc_processing.extract_text(file_path, file_name)
-        for doc in docs:
-            records.append({
-                "id": doc["id"],
-                "chunk_text": doc["chunk_text"],
-                "document_name": doc["document_name"]
-            })
-        
-        index.upsert_records(
-            records=records,
-            namespace=self.namespace
-        )
-        time.sleep(10)
-        return index.describe_index_stats()
+    def _upsert_batch(self, batch):
+        """Upsert one batch, backing off exponentially on throttling/5xx."""
+        delay = 0.5
+        for attempt in range(UPSERT_MAX_RETRIES + 1):
+            try:
+                self.store.upsert_records(batch)
+                return len(batch)
+            except self.store.retryable_errors as e:
+                # `status` on older Pinecone clients, `status_code` on newer ones
+                status = getattr(e, "status", None) or getattr(e, "status_code", None)
+                if status not in RETRYABLE_STATUS or attempt == UPSERT_MAX_RETRIES:
+                    raise
+                logger.warning(f"upsert throttled ({status}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay + random.uniform(0, delay / 2))
+                delay = min(delay * 2, 30)
+
+    def upsert_batches(self, records, batch_size=None, workers=None, on_upserted=None):
+        """
+        Send `records` (any iterable) in fixed-size batches from a bounded
+        thread pool. At most `2 * workers` batches are in flight, so a lazy
+        iterable is consumed no faster than the store accepts it.
+        `on_upserted(n)` is called as each batch of `n` records lands.
+
+        Returns the upserted ids and throughput stats.
+        """
+        batch_size = batch_size or UPSERT_BATCH_SIZE
+        workers = workers or UPSERT_WORKERS
+
+        ids = []
+        batches = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            for batch in batched(records, batch_size):
+                ids.extend(record["id"] for record in batch)
+                future = pool.submit(self._upsert_batch, batch)
+                if on_upserted:
+                    future.add_done_callback(lambda f: f.exception() or on_upserted(f.result()))
+                in_flight.add(future)
+                batches += 1
+                if len(in_flight) >= 2 * workers:
+                    done, in_flight = wait_futures(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+            for future in in_flight:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        stats = {
+            "batches": batches,
+            "upsert_seconds": round(elapsed, 3),
+            "records_per_sec": round(len(ids) / elapsed, 1) if elapsed else None,
+        }
+        return ids, stats
     
-    def delete_doc(self,file_name):
-        index=self.pc.Index(self.index_name)
-        index.delete(
-            namespace=self.namespace,
-            filter={
-                "document_name":{
-                    "$eq":file_name
+    def insert_doc(self,file_path, file_name, wait=False, timeout=None, force=False, progress=None):
+        job = self.insert_job(file_path, file_name, force=force, progress=progress)
+        if wait:
+            job.wait(timeout)
+        return job.to_dict()
+
+    def insert_job(self, file_path, file_name, force=False, progress=None) -> IndexJob:
+        """
+        Index one document and return its `IndexJob` (upserted ids included)
+        without waiting for visibility; `insert_doc` is the dict-returning
+        wrapper used by the API.
+        """
+        # Chunks stream straight from the parser into upsert batches, so the
+        # first pages are being embedded while later ones are still parsed.
+        # Chunks whose id and content hash match the manifest are already
+        # indexed and skipped, so a lightly edited re-upload only pays for
+        # the chunks that changed (`force` re-sends everything).
+        # `progress(pages_parsed=..., chunks_upserted=...)` reports headway.
+        indexed = {} if force else self.manifest.chunk_hashes(file_name)
+        current = {}
+        pages = set()
+        upserted = 0
+        upserted_lock = threading.Lock()
+
+        def on_upserted(n):
+            nonlocal upserted
+            with upserted_lock:
+                upserted += n
+                progress(chunks_upserted=upserted)
+
+        def changed_records():
+            for doc in self.doc_processing.iter_chunks(file_path, file_name):
+                if progress:
+                    page = doc["id"][len(file_name) + 2:].split("-c")[0]
+                    if page not in pages:
+                        pages.add(page)
+                        progress(pages_parsed=len(pages))
+                digest = content_hash(doc["chunk_text"])
+                current[doc["id"]] = digest
+                if indexed.get(doc["id"]) == digest:
+                    continue
+                yield {
+                    "id": doc["id"],
+                    "chunk_text": doc["chunk_text"],
+                    "document_name": doc["document_name"],
+                    "content_hash": digest,
                 }
-            }
+
+        ids, stats = self.upsert_batches(changed_records(), on_upserted=on_upserted if progress else None)
+
+        # Chunks the new version no longer has
+        stale_ids = sorted(set(self.manifest.chunk_ids(file_name)) - set(current))
+        if stale_ids:
+            self.store.delete(ids=stale_ids)
+        self.manifest.replace(file_name, current)
+        logger.info(
+            f"{file_name}: {len(current)} chunks, upserted {len(ids)} in {stats['batches']} batches "
+            f"({stats['records_per_sec']} rec/s), {len(stale_ids)} stale deleted"
         )
-        time.sleep(5)
-        return index.describe_index_stats()
+
+        job = IndexJob(self.store, "insert", file_name, ids)
+        job.stats = {
+            **stats,
+            "chunks": len(current),
+            "unchanged": len(current) - len(ids),
+            "stale_deleted": len(stale_ids),
+        }
+        return job
+
+    def list_doc_ids(self, file_name):
+        """Ids of a document's chunks, found via the `{file_name}-p{i}-c{j}` prefix."""
+        pattern = re.compile(rf"{re.escape(file_name)}-p\d+-c\d+")
+        return [i for i in self.store.list_ids(f"{file_name}-p") if pattern.fullmatch(i)]
+    
+    def delete_doc(self,file_name, wait=False, timeout=None):
+        if self.manifest.has_document(file_name):
+            ids = self.manifest.chunk_ids(file_name)
+            self.store.delete(ids=ids)
+        else:
+            # Indexed before the manifest existed: discover ids, filter-delete
+            ids = self.list_doc_ids(file_name)
+            self.store.delete(ids=ids, document_name=file_name)
+        self.manifest.remove(file_name)
+        job = IndexJob(self.store, "delete", file_name, ids)
+        if wait:
+            job.wait(timeout)
+        return job.to_dict()
+
+    def list_documents(self):
+        return self.manifest.documents()
+
+    def search(self, query, top_k=5):
+        return self.store.search(query, top_k=top_k)
+
+    def stats(self):
+        return self.store.stats()
 
     def delete_index(self):
-        self.pc.delete_index(self.index_name)
+        self.store.drop()
+        self.manifest.clear()
 
         return f"Clean up Index"
 
@@ -87,4 +302,4 @@ class Indexing:
 # results=index_procoseer.insert_doc(file_path=str(pdf_path),
 #     file_name="Abhishek_V_S_")
 # # results=index_procoseer.delete_doc("IITM Research Paper")
-# print(results)
\ No newline at end of file
+# print(results)
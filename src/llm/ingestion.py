@@ -0,0 +1,353 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from src.utils.log import AppLogger
+from config import get_config
+
+cfg = get_config()
+ingest_cfg = cfg.get("ingestion", {})
+logger = AppLogger.setup()
+
+JOB_COLUMNS = (
+    "id", "kind", "document_name", "file_path", "status", "pages_parsed", "chunks_upserted",
+    "result", "error", "created_at", "started_at", "finished_at", "batch_id", "keep_file",
+    "owner", "lease_until",
+)
+PROGRESS_INTERVAL = 0.5   # seconds between progress writes for one job
+FINISHED = ("done", "failed")
+
+
+def resolve_path(value, default) -> Path:
+    path = Path(value or default)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+class IngestionQueue:
+    """
+    Durable queue of ingestion jobs drained by a pool of worker threads.
+
+    Jobs live in SQLite (`queued -> running -> done | failed`) next to the
+    uploaded files they point to, so a restart picks up where it stopped.
+    Claims are a conditional UPDATE, so several processes can share one
+    queue file: a claimed job records its `owner` and a `lease_until` that
+    the owner's heartbeat keeps extending. Only `running` jobs whose lease
+    has expired (their process died) are queued again, never jobs a live
+    process is still working on.
+
+    `runner(job, progress)` does the work; `progress(pages_parsed=...,
+    chunks_upserted=...)` is persisted at most every `PROGRESS_INTERVAL`.
+    """
+
+    def __init__(self, path, upload_dir, runner, workers: int = 2, poll_interval: float = 1.0,
+                 lease_seconds: float = 60.0):
+        self.path = Path(path)
+        self.upload_dir = Path(upload_dir)
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    document_name TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    pages_parsed INTEGER NOT NULL DEFAULT 0,
+                    chunks_upserted INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    batch_id TEXT,
+                    keep_file INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    lease_until REAL
+                )
+                """
+            )
+            columns = {row[1] for row in con.execute("PRAGMA table_info(jobs)")}
+            if "batch_id" not in columns:
+                con.execute("ALTER TABLE jobs ADD COLUMN batch_id TEXT")
+            if "keep_file" not in columns:
+                con.execute("ALTER TABLE jobs ADD COLUMN keep_file INTEGER NOT NULL DEFAULT 0")
+            if "owner" not in columns:
+                con.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            if "lease_until" not in columns:
+                con.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+            con.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at)")
+            con.execute("CREATE INDEX IF NOT EXISTS jobs_batch ON jobs(batch_id)")
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def _row_to_dict(row) -> dict:
+        job = dict(zip(JOB_COLUMNS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["keep_file"] = bool(job["keep_file"])
+        return job
+
+    def upload_path(self, job_id: str, suffix: str = ".pdf") -> Path:
+        """Where the uploaded file for `job_id` is kept until the job finishes."""
+        return self.upload_dir / f"{job_id}{suffix}"
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def enqueue(self, document_name: str, file_path, kind: str = "insert", job_id: str = None,
+                batch_id: str = None, keep_file: bool = False) -> dict:
+        """
+        Queue one document. The file at `file_path` is removed when the job
+        finishes unless `keep_file` (e.g. it lives in a source directory).
+        """
+        job_id = job_id or self.new_job_id()
+        with self._connect() as con:
+            con.execute(
+                "INSERT INTO jobs (id, kind, document_name, file_path, status, created_at, batch_id, keep_file) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, document_name, str(file_path), time.time(), batch_id, int(keep_file)),
+            )
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def wait(self, job_id: str, timeout: float = None):
+        """Block until the job is done or failed (or `timeout` passes); returns the job."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in FINISHED:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(self.poll_interval if deadline is None else
+                       max(0.0, min(self.poll_interval, deadline - time.monotonic())))
+
+    def retry(self, job_id: str):
+        """Queue a failed job again; its upload is kept on failure for this."""
+        with self._connect() as con:
+            requeued = con.execute(
+                "UPDATE jobs SET status = 'queued', error = NULL, started_at = NULL, finished_at = NULL, "
+                "pages_parsed = 0, chunks_upserted = 0 WHERE id = ? AND status = 'failed'",
+                (job_id,),
+            ).rowcount
+        if requeued:
+            self._wakeup.set()
+        return self.get(job_id) if requeued else None
+
+    def batch_summary(self, batch_id: str):
+        """Status counts and aggregate throughput of the jobs in a batch."""
+        with self._connect() as con:
+            by_status = dict(con.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE batch_id = ? GROUP BY status", (batch_id,)
+            ).fetchall())
+            if not by_status:
+                return None
+            pages, chunks, started, finished, created = con.execute(
+                "SELECT SUM(pages_parsed), SUM(chunks_upserted), MIN(started_at), MAX(finished_at), MIN(created_at) "
+                "FROM jobs WHERE batch_id = ?",
+                (batch_id,),
+            ).fetchone()
+            failed = [
+                {"id": job_id, "document_name": name, "error": error}
+                for job_id, name, error in con.execute(
+                    "SELECT id, document_name, error FROM jobs WHERE batch_id = ? AND status = 'failed'", (batch_id,)
+                )
+            ]
+
+        documents = sum(by_status.values())
+        complete = by_status.get("done", 0) + by_status.get("failed", 0) == documents
+        end = finished if complete else time.time()
+        elapsed = end - (started or created) if started else 0.0
+        return {
+            "batch_id": batch_id,
+            "documents": documents,
+            "status": by_status,
+            "complete": complete,
+            "pages_parsed": pages or 0,
+            "chunks_upserted": chunks or 0,
+            "elapsed": round(elapsed, 3),
+            "docs_per_sec": round(by_status.get("done", 0) / elapsed, 2) if elapsed else None,
+            "chunks_per_sec": round((chunks or 0) / elapsed, 1) if elapsed else None,
+            "failed": failed,
+        }
+
+    def get(self, job_id: str):
+        with self._connect() as con:
+            row = con.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self, status: str = None, limit: int = 50):
+        query = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as con:
+            return [self._row_to_dict(row) for row in con.execute(query, params)]
+
+    def _update(self, job_id: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as con:
+            con.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _claim(self):
+        """Atomically move the oldest queued job to `running`; None when idle."""
+        with self._connect() as con:
+            while True:
+                row = con.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                claimed = con.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, owner = ?, lease_until = ? "
+                    "WHERE id = ? AND status = 'queued'",
+                    (now, self.owner, now + self.lease_seconds, row[0]),
+                ).rowcount
+                if claimed:
+                    break
+        return self.get(row[0])
+
+    def _progress_reporter(self, job_id: str):
+        counts = {}
+        last_write = 0.0
+
+        def progress(**update):
+            nonlocal last_write
+            counts.update(update)
+            now = time.monotonic()
+            if now - last_write >= PROGRESS_INTERVAL:
+                last_write = now
+                self._update(job_id, **counts)
+
+        return progress, counts
+
+    def _run(self, job: dict):
+        progress, counts = self._progress_reporter(job["id"])
+        logger.info(f"ingestion job {job['id']} started: {job['document_name']}")
+        try:
+            result = self.runner(job, progress)
+        except Exception as e:
+            logger.exception(f"ingestion job {job['id']} failed")
+            self._update(job["id"], **counts, status="failed", error=str(e), finished_at=time.time())
+        else:
+            self._update(
+                job["id"], **counts, status="done",
+                result=json.dumps(result, default=str), finished_at=time.time(),
+            )
+            logger.info(f"ingestion job {job['id']} done: {job['document_name']}")
+            # Failed uploads stay on disk so the job can be retried
+            if not job["keep_file"] and os.path.exists(job["file_path"]):
+                os.remove(job["file_path"])
+
+    def _worker(self):
+        while not self._stop.is_set():
+            job = self._claim()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _renew_leases(self):
+        """Extend the lease of every job this process is running."""
+        with self._connect() as con:
+            con.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, self.owner),
+            )
+
+    def requeue_expired(self) -> int:
+        """Queue again `running` jobs whose owner stopped renewing the lease."""
+        with self._connect() as con:
+            requeued = con.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL, lease_until = NULL "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (time.time(),),
+            ).rowcount
+        if requeued:
+            logger.info(f"requeued {requeued} interrupted ingestion jobs")
+            self._wakeup.set()
+        return requeued
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self._renew_leases()
+                self.requeue_expired()
+            except sqlite3.Error as e:
+                logger.warning(f"ingestion heartbeat failed: {e}")
+
+    def start(self):
+        """Requeue jobs whose process died and start the worker and heartbeat threads."""
+        if self._threads:
+            return
+        self.requeue_expired()
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"ingestion-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat, name="ingestion-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+_ingestion_queue = None
+_ingestion_queue_lock = threading.Lock()
+
+
+def get_ingestion_queue(runner) -> IngestionQueue:
+    """Process-wide queue built from the `ingestion` config section."""
+    global _ingestion_queue
+    if _ingestion_queue is None:
+        with _ingestion_queue_lock:
+            if _ingestion_queue is None:
+                _ingestion_queue = IngestionQueue(
+                    resolve_path(ingest_cfg.get("queue_path"), ".cache/ingestion.sqlite"),
+                    resolve_path(ingest_cfg.get("upload_dir"), ".cache/uploads"),
+                    runner,
+                    workers=ingest_cfg.get("workers", 2),
+                    poll_interval=ingest_cfg.get("poll_interval", 1.0),
+                    lease_seconds=ingest_cfg.get("lease_seconds", 60),
+                )
+    return _ingestion_queue
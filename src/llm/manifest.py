@@ -0,0 +1,144 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from config import get_config
+
+index_cfg = get_config().get("indexing", {})
+
+
+class DocumentManifest:
+    """
+    Local record of what is indexed: `document_name -> {chunk id: content hash}`.
+
+    Kept in SQLite next to the vector store so deletes can target ids
+    directly, re-uploads can diff old vs new chunks (and skip unchanged ones),
+    and listing documents never touches the index. `scope` separates
+    backends/indexes/namespaces sharing one manifest file.
+    """
+
+    def __init__(self, path, scope: str):
+        self.path = Path(path)
+        self.scope = scope
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    scope TEXT NOT NULL,
+                    document_name TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    content_hash TEXT,
+                    PRIMARY KEY (scope, chunk_id)
+                )
+                """
+            )
+            columns = {row[1] for row in con.execute("PRAGMA table_info(chunks)")}
+            if "content_hash" not in columns:
+                con.execute("ALTER TABLE chunks ADD COLUMN content_hash TEXT")
+            con.execute("CREATE INDEX IF NOT EXISTS chunks_document ON chunks(scope, document_name)")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    scope TEXT NOT NULL,
+                    document_name TEXT NOT NULL,
+                    chunks INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (scope, document_name)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def chunk_ids(self, document_name: str):
+        with self._connect() as con:
+            return [i for (i,) in con.execute(
+                "SELECT chunk_id FROM chunks WHERE scope = ? AND document_name = ?",
+                (self.scope, document_name),
+            )]
+
+    def chunk_hashes(self, document_name: str) -> dict:
+        """`{chunk id: content hash}` as last indexed (hash is None for legacy rows)."""
+        with self._connect() as con:
+            return dict(con.execute(
+                "SELECT chunk_id, content_hash FROM chunks WHERE scope = ? AND document_name = ?",
+                (self.scope, document_name),
+            ))
+
+    def replace(self, document_name: str, chunk_hashes: dict):
+        """Record `{chunk id: content hash}` as the complete current set for a document."""
+        with self._lock, self._connect() as con:
+            con.execute(
+                "DELETE FROM chunks WHERE scope = ? AND document_name = ?", (self.scope, document_name)
+            )
+            con.executemany(
+                "INSERT OR REPLACE INTO chunks (scope, document_name, chunk_id, content_hash) VALUES (?, ?, ?, ?)",
+                [(self.scope, document_name, i, h) for i, h in chunk_hashes.items()],
+            )
+            con.execute(
+                "INSERT OR REPLACE INTO documents (scope, document_name, chunks, updated_at) VALUES (?, ?, ?, ?)",
+                (self.scope, document_name, len(chunk_hashes), time.time()),
+            )
+
+    def remove(self, document_name: str):
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM chunks WHERE scope = ? AND document_name = ?", (self.scope, document_name))
+            con.execute("DELETE FROM documents WHERE scope = ? AND document_name = ?", (self.scope, document_name))
+
+    def documents(self):
+        with self._connect() as con:
+            return [
+                {"document_name": name, "chunks": chunks, "updated_at": updated_at}
+                for name, chunks, updated_at in con.execute(
+                    "SELECT document_name, chunks, updated_at FROM documents WHERE scope = ? ORDER BY document_name",
+                    (self.scope,),
+                )
+            ]
+
+    def has_document(self, document_name: str) -> bool:
+        with self._connect() as con:
+            return con.execute(
+                "SELECT 1 FROM documents WHERE scope = ? AND document_name = ?", (self.scope, document_name)
+            ).fetchone() is not None
+
+    def clear(self):
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM chunks WHERE scope = ?", (self.scope,))
+            con.execute("DELETE FROM documents WHERE scope = ?", (self.scope,))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(scope: str) -> DocumentManifest:
+    """Process-wide manifest for a `backend/index/namespace` scope."""
+    with _manifests_lock:
+        if scope not in _manifests:
+            path = Path(index_cfg.get("manifest_path", ".cache/manifest.sqlite"))
+            if not path.is_absolute():
+                path = PROJECT_ROOT / path
+            _manifests[scope] = DocumentManifest(path, scope)
+        return _manifests[scope]
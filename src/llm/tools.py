@@ -1,76 +1,193 @@
 from pathlib import Path
 import sys
-import duckdb
-import pandas as pd
+import asyncio
+import threading
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
-from config import get_config
-import os
+from config import export_env, get_config
 
 cfg=get_config()
-os.environ["TAVILY_API_KEY"] = cfg["keys"]["tavily_api_key"]
+retrieval_cfg = cfg.get("retrieval", {})
+session_cfg = cfg.get("sessions", {})
+sql_cfg = cfg.get("sql", {})
+export_env(cfg)
 
 from langchain.tools import tool
-from langchain_tavily import TavilySearch
-from mistralai import Mistral
+from langchain_core.tools import StructuredTool
+from langchain_core.runnables import RunnableConfig
 import base64
 from src.utils.pdf_processor import TextProcessor
+from src.utils.attachment import open_source
+from src.utils.table_cache import connect_table, table_fingerprint, table_profiles
+from src.utils.query_cache import QueryCache, schema_hash
+from src.utils.query_results import bounded_result, get_result_store
+from src.utils.table_profile import format_schema
+from src.utils.retrieval import BM25Ranker
+from src.utils.session_store import SessionStore
+from src.llm.agent_registry import get_agent_registry
 from src.utils.log import AppLogger
-from langchain_mistralai import ChatMistralAI
 from src.prompts.sql_system_prompt import template
 from src.utils import sql_utils
 logger = AppLogger.setup()
 
 def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
+    with open_source(image_path) as image_file:
         return base64.b64encode(image_file.read()).decode('utf-8')
 
 
+def encode_audio(audio_path):
+    with open_source(audio_path) as audio_file:
+        return base64.b64encode(audio_file.read()).decode("utf-8")
+
+
+def image_messages(query, base64_image):
+    return [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": query},
+                {
+                    "type": "image_url",
+                    "image_url": f"data:image/jpeg;base64,{base64_image}"
+                }
+            ]
+        }
+    ]
+
+
+def audio_messages(query, audio_base64):
+    return [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "input_audio",
+                    "input_audio": audio_base64
+                },
+                {
+                    "type": "text",
+                    "text": query
+                }
+            ]
+        }
+    ]
+
+
+MULTI_MODAL_AGENT = {
+    "model": "mistral-medium-2505",
+    "name": "Multi-Modal Agent",
+    "description": (
+        "Agent capable of complex reasoning using web search, "
+        "code execution, and image generation."
+    ),
+    "instructions": (
+        "You are a Multi-Modal Agent.\n"
+        "- Use `web_search` for real-time information\n"
+        "- Use `code_interpreter` for calculations or code execution\n"
+        "- Use `image_generation` to generate images\n"
+        "- Combine tools when needed\n"
+        "- Respond concisely and accurately"
+    ),
+    "tools": [
+        {"type": "web_search"},
+        {"type": "code_interpreter"},
+        {"type": "image_generation"},
+    ],
+    "completion_args": {
+        "temperature": 0.3,
+        "top_p": 0.95,
+    },
+}
+
+
+def is_missing_agent(error) -> bool:
+    """True when a conversation failed because the recorded agent no longer exists."""
+    return getattr(error, "status_code", None) == 404
+
+
 class Tools:
     def __init__(self):
         self.mistral_api_key = cfg["keys"]["mistral_api_key"]
-        self.client = Mistral(api_key=self.mistral_api_key)
         self.vision_model = "mistral-small-latest"
         self.audio_model="voxtral-mini-latest"
-        self.llm = ChatMistralAI(
-                model="codestral-latest",
-                temperature=0,
-                api_key=self.mistral_api_key
-            )
-        self.multi_modal_agent = self.client.beta.agents.create(
-            model="mistral-medium-2505",
-            name="Multi-Modal Agent",
-            description=(
-                "Agent capable of complex reasoning using web search, "
-                "code execution, and image generation."
-            ),
-            instructions=(
-                "You are a Multi-Modal Agent.\n"
-                "- Use `web_search` for real-time information\n"
-                "- Use `code_interpreter` for calculations or code execution\n"
-                "- Use `image_generation` to generate images\n"
-                "- Combine tools when needed\n"
-                "- Respond concisely and accurately"
-            ),
-            tools=[
-                {"type": "web_search"},
-                {"type": "code_interpreter"},
-                {"type": "image_generation"},
-            ],
-            completion_args={
-                "temperature": 0.3,
-                "top_p": 0.95,
-            }
+        # Clients (and their SDK imports) are built on first use, so
+        # importing/constructing the tools stays cheap on cold start.
+        self._client = None
+        self._llm = None
+        self._multi_modal_agent_id = None
+        self._lazy_lock = threading.Lock()
+
+        # Remote multimodal conversation per chat session (id + turn count)
+        self.sessions = SessionStore(
+            max_sessions=session_cfg.get("max_sessions", 1000),
+            ttl=session_cfg.get("ttl_seconds", 3600)
+        )
+        self.query_cache = QueryCache(sql_cfg)
+        self.max_multimodal_turns = session_cfg.get("max_multimodal_turns", 20)
+        self.ranker = BM25Ranker(
+            k1=retrieval_cfg.get("bm25_k1", 1.5),
+            b=retrieval_cfg.get("bm25_b", 0.75)
         )
 
-        self.multi_modal_conv_id = None
 
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lazy_lock:
+                if self._client is None:
+                    from mistralai import Mistral
+                    self._client = Mistral(api_key=self.mistral_api_key)
+        return self._client
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._lazy_lock:
+                if self._llm is None:
+                    from langchain_mistralai import ChatMistralAI
+                    self._llm = ChatMistralAI(
+                        model="codestral-latest",
+                        temperature=0,
+                        api_key=self.mistral_api_key
+                    )
+        return self._llm
+
+    @property
+    def multi_modal_agent_id(self):
+        # Reuses the agent recorded for this exact definition instead of
+        # creating a new remote agent on every start
+        if self._multi_modal_agent_id is None:
+            client = self.client
+            with self._lazy_lock:
+                if self._multi_modal_agent_id is None:
+                    self._multi_modal_agent_id = get_agent_registry().get_or_create(
+                        client, MULTI_MODAL_AGENT, api_key=self.mistral_api_key
+                    )
+        return self._multi_modal_agent_id
+
+    def refresh_multimodal_agent(self):
+        """Re-create the agent after its recorded id was deleted server-side."""
+        self._multi_modal_agent_id = get_agent_registry().get_or_create(
+            self.client, MULTI_MODAL_AGENT, api_key=self.mistral_api_key, refresh=True
+        )
+
+    def multimodal_session(self, config: RunnableConfig) -> dict:
+        """
+        Conversation state for the session in `config["configurable"]`.
+        Calls without a session id get a throwaway state (a fresh remote
+        conversation); sessions past `max_multimodal_turns` start over so
+        the remote context stays small.
+        """
+        session_id = ((config or {}).get("configurable") or {}).get("session_id")
+        state = self.sessions.get(session_id) if session_id else {}
+        if state.get("turns", 0) >= self.max_multimodal_turns:
+            state.clear()
+        return state
 
     def __call__(self):
 
-        @tool
-        def multimodal_tool(query: str):
+        def multimodal_tool(query: str, config: RunnableConfig):
             """
             Use the Multi-Modal Agent for complex reasoning tasks that may
             require web search, computation, or image generation.
@@ -78,17 +195,28 @@ class Tools:
             try:
                 logger.info("Calling Multi-Modal Agent")
 
-                if not self.multi_modal_conv_id:
-                    response = self.client.beta.conversations.start(
-                        agent_id=self.multi_modal_agent.id,
-                        inputs=query
-                    )
-                    self.multi_modal_conv_id = response.conversation_id
+                session = self.multimodal_session(config)
+                if not session.get("conversation_id"):
+                    try:
+                        response = self.client.beta.conversations.start(
+                            agent_id=self.multi_modal_agent_id,
+                            inputs=query
+                        )
+                    except Exception as e:
+                        if not is_missing_agent(e):
+                            raise
+                        self.refresh_multimodal_agent()
+                        response = self.client.beta.conversations.start(
+                            agent_id=self.multi_modal_agent_id,
+                            inputs=query
+                        )
+                    session["conversation_id"] = response.conversation_id
                 else:
                     response = self.client.beta.conversations.append(
-                        conversation_id=self.multi_modal_conv_id,
+                        conversation_id=session["conversation_id"],
                         inputs=query
                     )
+                session["turns"] = session.get("turns", 0) + 1
 
                 # final_text = extract_final_text(response)
                 logger.success("Multi-Modal Agent responded")
@@ -98,41 +226,82 @@ class Tools:
                 logger.error(f"Multi-Modal Agent failed: {e}")
                 return [{"content": "Multi-modal processing failed"}]
 
+        async def amultimodal_tool(query: str, config: RunnableConfig):
+            try:
+                logger.info("Calling Multi-Modal Agent (async)")
+
+                session = self.multimodal_session(config)
+                if not session.get("conversation_id"):
+                    # First use may create the remote agent: keep it off the loop
+                    agent_id = await asyncio.to_thread(lambda: self.multi_modal_agent_id)
+                    try:
+                        response = await self.client.beta.conversations.start_async(
+                            agent_id=agent_id,
+                            inputs=query
+                        )
+                    except Exception as e:
+                        if not is_missing_agent(e):
+                            raise
+                        await asyncio.to_thread(self.refresh_multimodal_agent)
+                        response = await self.client.beta.conversations.start_async(
+                            agent_id=self.multi_modal_agent_id,
+                            inputs=query
+                        )
+                    session["conversation_id"] = response.conversation_id
+                else:
+                    response = await self.client.beta.conversations.append_async(
+                        conversation_id=session["conversation_id"],
+                        inputs=query
+                    )
+                session["turns"] = session.get("turns", 0) + 1
+
+                logger.success("Multi-Modal Agent responded")
+                return [{"content": response.outputs}]
+
+            except Exception as e:
+                logger.error(f"Multi-Modal Agent failed: {e}")
+                return [{"content": "Multi-modal processing failed"}]
+
 
 
         @tool
-        def query_from_pdf(file_path: str, file_name: str):
+        def query_from_pdf(query: str, file_path: str, file_name: str):
             """
-            Extract and retrieve text content from a PDF file.
+            Retrieve the passages of a PDF file that are most relevant to a question.
 
             Use this tool when the user asks questions that should be answered
             using the contents of an uploaded or local PDF document.
 
             Args:
                 query (str): The user question related to the PDF.
-                file_path (str): Directory path where the PDF is stored.
+                file_path (str): Path or attachment:// URI of the PDF.
                 file_name (str): Name of the PDF file.
 
             Returns:
-                List[str]: Extracted text chunks from the PDF.
+                List[Dict]: Top ranked chunks (id with page number, text, score).
             """
             try:
                 logger.info("calling query_from_pdf tool")
                 
                 text_processor = TextProcessor()
-                docs = text_processor.extract_text(
+                chunks = text_processor.iter_chunks(
                     file_path=str(file_path),
                     file_name=file_name
                 )
+                docs = self.ranker.top_k(
+                    query,
+                    chunks,
+                    k=retrieval_cfg.get("top_k", 8),
+                    max_tokens=retrieval_cfg.get("max_tokens", 3000)
+                )
                 
-                logger.success("query_from_pdf tool responded")
+                logger.success(f"query_from_pdf tool responded with {len(docs)} chunks")
             except Exception as e:
                 logger.error(f"query_from_pdf error due to : {e} ")
                 docs=[{"content":"technical error"}]
 
             return docs
 
-        @tool
         def query_from_image(query: str, image_path: str):
             """
             Analyze an image and answer a query using a vision-capable LLM.
@@ -142,7 +311,7 @@ class Tools:
 
             Args:
                 query (str): Question or instruction related to the image.
-                image_path (str): Path to the image file.
+                image_path (str): Path or attachment:// URI of the image file.
 
             Returns:
                 List[Dict]: Model-generated response based on image understanding.
@@ -152,22 +321,9 @@ class Tools:
                 
                 base64_image = encode_image(image_path)
 
-                messages = [
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": query},
-                            {
-                                "type": "image_url",
-                                "image_url": f"data:image/jpeg;base64,{base64_image}"
-                            }
-                        ]
-                    }
-                ]
-
                 chat_response = self.client.chat.complete(
                     model=self.vision_model,
-                    messages=messages
+                    messages=image_messages(query, base64_image)
                 )
 
                 content = chat_response.choices[0].message.content
@@ -177,8 +333,26 @@ class Tools:
             except Exception as e:
                 logger.error(f"query_from_image error due to : {e} ")
                 return [{"content":"technical error in mistral"}]
+
+        async def aquery_from_image(query: str, image_path: str):
+            try:
+                logger.info("calling query_from_image tool (async)")
+
+                base64_image = await asyncio.to_thread(encode_image, image_path)
+
+                chat_response = await self.client.chat.complete_async(
+                    model=self.vision_model,
+                    messages=image_messages(query, base64_image)
+                )
+
+                content = chat_response.choices[0].message.content
+                logger.success("query_from_image tool responded")
+
+                return [{"image_content": content}]
+            except Exception as e:
+                logger.error(f"query_from_image error due to : {e} ")
+                return [{"content":"technical error in mistral"}]
         
-        @tool
         def query_from_audio(query: str, audio_path: str):
             """
             Analyze an audio file and answer the user's query using an audio-capable LLM.
@@ -189,7 +363,7 @@ class Tools:
 
             Args:
                 query (str): The user question or instruction related to the audio.
-                audio_path (str): Path to the audio file on disk.
+                audio_path (str): Path or attachment:// URI of the audio file.
 
             Returns:
                 List[Dict]: Model-generated response based on audio understanding.
@@ -198,28 +372,11 @@ class Tools:
                 logger.info("calling query_from_audio tool")
                 
                 # Encode audio file as base64
-                with open(audio_path, "rb") as f:
-                    content = f.read()
-
-                audio_base64 = base64.b64encode(content).decode("utf-8")
+                audio_base64 = encode_audio(audio_path)
 
                 chat_response = self.client.chat.complete(
                     model=self.audio_model,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "input_audio",
-                                    "input_audio": audio_base64
-                                },
-                                {
-                                    "type": "text",
-                                    "text": query
-                                }
-                            ]
-                        }
-                    ]
+                    messages=audio_messages(query, audio_base64)
                 )
 
                 content = chat_response.choices[0].message.content
@@ -229,6 +386,26 @@ class Tools:
             except Exception as e:
                 logger.error(f"query_from_audio error due to : {e} ")
                 return [{"content":"technical error in mistral"}]
+
+        async def aquery_from_audio(query: str, audio_path: str):
+            try:
+                logger.info("calling query_from_audio tool (async)")
+
+                audio_base64 = await asyncio.to_thread(encode_audio, audio_path)
+
+                chat_response = await self.client.chat.complete_async(
+                    model=self.audio_model,
+                    messages=audio_messages(query, audio_base64)
+                )
+
+                content = chat_response.choices[0].message.content
+
+                logger.success("query_from_audio tool responded")
+                return [{"audio_content": content}]
+            except Exception as e:
+                logger.error(f"query_from_audio error due to : {e} ")
+                return [{"content":"technical error in mistral"}]
+
         @tool
         def sql_user_query_tool(user_query: str, file_path: str, table_name: str):
             """
@@ -242,66 +419,126 @@ class Tools:
             - Fast, in-memory analytics is sufficient
 
             Behavior:
-            - Creates an in-memory DuckDB database
-            - Loads CSV files using DuckDB's read_csv_auto
-            - Loads Excel files using pandas and registers them as a DuckDB table
-            - Extracts the table schema using DESCRIBE
+            - Loads CSV files using DuckDB's read_csv_auto; Excel files are streamed
+              sheet by sheet (openpyxl -> Arrow -> DuckDB), one table per sheet
+            - Caches the loaded table as a DuckDB file keyed by the file's content,
+              so follow-up questions on the same file skip parsing
+            - Builds the schema from a column profile cached with the table (types,
+              distinct counts, ranges, sample values), keeping only the columns
+              most related to the question for wide tables
             - Sends the schema, table name, and user question to an LLM
             - Parses and cleans the LLM-generated SQL
             - Executes the SQL query against DuckDB
+            - Caches the SQL per (normalized question, schema) and the rows per
+              (SQL, file content), so repeated questions skip the LLM and the scan
+            - Returns at most `sql.max_result_rows` rows (and `sql.max_result_kb`
+              of JSON) with a summary; the full result is available page by page
+              or as Parquet/CSV from `/results/{result_id}` without the LLM
             - Returns the query result as structured data
 
             Important:
             - The generated SQL MUST reference the provided `table_name`
             - The LLM is responsible for generating DuckDB-compatible SQL
             - Only CSV (.csv) and Excel (.xlsx) file formats are supported
-            - The database exists only for the duration of this function call
-            - No data is persisted to disk
+            - The query runs on an in-memory connection over the cached table
 
             Args:
                 user_query (str): Natural-language question from the user.
-                file_path (str): Absolute or relative path to the uploaded file.
+                file_path (str): Path or attachment:// URI of the uploaded file.
                 table_name (str): Name of the DuckDB table created from the file.
 
             Returns:
-                List[Dict]: Query results as a list of row dictionaries.
-                Dict: Error information if any step fails (loading, SQL generation, or execution).
+                Dict: `rows` (list of row dictionaries), `columns`, `row_count`,
+                    `returned_rows`, `truncated` and `result_id` (None for
+                    statements such as PRAGMA or EXPLAIN, which cannot be paged).
+                List[Dict]: Error information if any step fails (loading, SQL generation, or execution).
             """
 
+            con = None
             try:
-                con = duckdb.connect(database=":memory:")
-                
                 logger.info("calling query from structured files tool!")
-                if file_path.endswith(".csv"):
-                    con.execute(f"""
-                        CREATE TABLE {table_name} AS
-                        SELECT * FROM read_csv_auto('{file_path}')
-                    """)
-                elif file_path.endswith(".xlsx"):
-                    df = pd.read_excel(file_path)
-                    con.register(table_name, df)
-              
-                schema = con.execute(f"DESCRIBE {table_name}").fetchall()
-                table_schema="\n".join([f"{col[0]} ({col[1]})" for col in schema])
-                response = self.llm.invoke(
-                            template.format_messages(
-                                table_name=table_name,
-                                schema=table_schema,
-                                user_query=user_query
+                # Hashed once per question; keys the cached table, the rows and `result_id`
+                fingerprint = table_fingerprint(file_path, sql_cfg)
+                # Parsed once per file content; repeat questions attach the cached table
+                con = connect_table(file_path, table_name, sql_cfg, fingerprint)
+
+                profiles = table_profiles(con, table_name, sql_cfg)
+                schema_key = schema_hash(table_name, profiles)
+
+                # Same question on the same table layout -> reuse the generated SQL
+                clean_query = self.query_cache.get_sql(user_query, schema_key)
+                generated = clean_query is None
+                if generated:
+                    # Profiled once at load time; wide tables are pruned to the relevant columns
+                    max_columns = int(sql_cfg.get("prompt_max_columns", 40))
+                    schemas = []
+                    for table, profile in profiles.items():
+                        columns = format_schema(profile, user_query, max_columns)
+                        # Other sheets of a workbook are their own `<table_name>_<sheet>` tables
+                        schemas.append(columns if table == table_name else f"Other table {table}:\n{columns}")
+                    table_schema = "\n\n".join(schemas)
+                    response = self.llm.invoke(
+                                template.format_messages(
+                                    table_name=table_name,
+                                    schema=table_schema,
+                                    user_query=user_query
+                                )
                             )
-                        )
-                logger.info("SQL query generated!")
-                sections=sql_utils.parse_llm_response(response.content)
-                sql_query=sections["sql"]
-                clean_query = sql_utils.clean_sql(sql_query)
-                result = con.execute(clean_query).df()
-               
+                    logger.info("SQL query generated!")
+                    sections=sql_utils.parse_llm_response(response.content)
+                    sql_query=sections["sql"]
+                    clean_query = sql_utils.clean_sql(sql_query)
+                else:
+                    logger.info("SQL query served from cache")
+
+                # Same SQL on the same file content -> reuse the rows
+                result_store = get_result_store(sql_cfg)
+                result = self.query_cache.get_rows(clean_query, fingerprint)
+                if result is None:
+                    # Only a bounded page reaches the agent; the rest stays behind `result_id`
+                    result = bounded_result(
+                        con, clean_query,
+                        max_rows=int(sql_cfg.get("max_result_rows", 200)),
+                        max_bytes=int(sql_cfg.get("max_result_kb", 64)) * 1024,
+                        count_rows=sql_cfg.get("count_truncated_rows", True),
+                    )
+                    # PRAGMA/EXPLAIN and the like cannot be re-run as a subquery, so are never paged
+                    wrapped = result.pop("wrapped")
+                    result["result_id"] = (
+                        result_store.register(clean_query, file_path, table_name, fingerprint, sql_cfg)
+                        if wrapped else None
+                    )
+                    self.query_cache.put_rows(clean_query, fingerprint, result)
+                else:
+                    logger.info("query result served from cache")
+                    if result["result_id"]:
+                        # Keeps `/results/{result_id}` alive for as long as the rows are served
+                        result_store.register(clean_query, file_path, table_name, fingerprint, sql_cfg)
+                # Only SQL that executed is worth reusing
+                if generated:
+                    self.query_cache.put_sql(user_query, schema_key, clean_query)
+
                 logger.success("query from structured files tool responded..")
-                return result.to_dict(orient="records")
+                return result
             except Exception as e:
                 logger.error(f"error: {e}")
                 return [{"content":"technical error in sql pre-processing"}]
+            finally:
+                if con is not None:
+                    con.close()
             
 
+        # Mistral backed tools expose both a blocking and an async
+        # implementation so `agent.ainvoke` never blocks the event loop.
+        multimodal_tool = StructuredTool.from_function(
+            func=multimodal_tool, coroutine=amultimodal_tool
+        )
+        query_from_image = StructuredTool.from_function(
+            func=query_from_image, coroutine=aquery_from_image
+        )
+        query_from_audio = StructuredTool.from_function(
+            func=query_from_audio, coroutine=aquery_from_audio
+        )
+
         tools = [query_from_pdf, multimodal_tool, query_from_image,query_from_audio,sql_user_query_tool]
         return tools
\ No newline at end of file
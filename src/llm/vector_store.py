@@ -0,0 +1,543 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+from pinecone import Pinecone
+from pinecone.exceptions import PineconeApiException
+
+from src.utils.retrieval import tokenize
+from config import get_config
+
+cfg=get_config()
+index_cfg = cfg.get("indexing", {})
+
+FETCH_BATCH_SIZE = 100
+DELETE_BATCH_SIZE = 1000
+
+
+class VectorStore(ABC):
+    """
+    Storage backend behind `Indexing`.
+
+    Records are the `{"id", "chunk_text", "document_name"}` dicts built from
+    `TextProcessor` chunks; each backend embeds `chunk_text` itself.
+    Errors in `retryable_errors` that carry a 429/5xx `status` are retried
+    by `Indexing` with backoff.
+    """
+
+    retryable_errors = ()
+
+    @abstractmethod
+    def upsert_records(self, records):
+        ...
+
+    @abstractmethod
+    def fetch_ids(self, ids) -> set:
+        """Subset of `ids` currently visible in the store."""
+
+    @abstractmethod
+    def list_ids(self, prefix: str):
+        """Id strings of the stored records starting with `prefix`."""
+
+    @abstractmethod
+    def delete(self, ids=None, document_name=None):
+        ...
+
+    @abstractmethod
+    def search(self, query: str, top_k: int = 5):
+        """Best matching records as `{"id", "score", "chunk_text", "document_name"}`."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    @abstractmethod
+    def drop(self):
+        ...
+
+
+# ---------------------------------------------------------------------------
+# Pinecone (remote, integrated embedding)
+# ---------------------------------------------------------------------------
+
+# Process-wide Pinecone state: one client (with its HTTP connection pool) and
+# one ready Index handle per index name, shared by every `Indexing` instance.
+_pinecone = None
+_index_handles = {}
+_pinecone_lock = threading.RLock()
+
+
+def get_pinecone() -> Pinecone:
+    """Return the shared Pinecone client, creating it on first use."""
+    global _pinecone
+    if _pinecone is None:
+        with _pinecone_lock:
+            if _pinecone is None:
+                kwargs = {
+                    "api_key": cfg["keys"]["pinecone_key"],
+                    # Index handles share the client's connection pool settings
+                    "connection_pool_maxsize": index_cfg.get("connection_pool_maxsize", 16),
+                }
+                if index_cfg.get("host"):
+                    kwargs["host"] = index_cfg["host"]
+                _pinecone = Pinecone(**kwargs)
+    return _pinecone
+
+
+def get_index(index_name: str):
+    """
+    Return a shared, ready-to-use Index handle.
+
+    The index is created if missing and polled until ready only the first
+    time a given name is requested in this process; later calls are a dict
+    lookup.
+    """
+    index = _index_handles.get(index_name)
+    if index is not None:
+        return index
+
+    with _pinecone_lock:
+        if index_name not in _index_handles:
+            pc = get_pinecone()
+            if not pc.has_index(index_name):
+                pc.create_index_for_model(
+                    name=index_name,
+                    region=index_cfg.get("region", "us-east-1"),
+                    cloud=index_cfg.get("cloud", "aws"),
+                    embed={
+                        "model": index_cfg.get("embed_model", "llama-text-embed-v2"),
+                        "field_map": {
+                            "text":"chunk_text"
+                        }
+                    }
+                )
+            # Wait for the index to be ready
+            description = pc.describe_index(index_name)
+            while not description.status['ready']:
+                time.sleep(2)
+                description = pc.describe_index(index_name)
+
+            _index_handles[index_name] = pc.Index(
+                host=description.host,
+                pool_threads=index_cfg.get("pool_threads", 8),
+            )
+    return _index_handles[index_name]
+
+
+def reset_index_handles():
+    """Drop cached handles (e.g. after deleting an index or in benchmarks)."""
+    global _pinecone
+    with _pinecone_lock:
+        _index_handles.clear()
+        _pinecone = None
+
+
+class PineconeStore(VectorStore):
+    retryable_errors = (PineconeApiException,)
+
+    def __init__(self, index_name: str, namespace: str):
+        self.index_name = index_name
+        self.namespace = namespace
+        self.index = get_index(index_name)
+
+    def upsert_records(self, records):
+        self.index.upsert_records(
+            records=records,
+            namespace=self.namespace
+        )
+
+    def fetch_ids(self, ids) -> set:
+        found = set()
+        for start in range(0, len(ids), FETCH_BATCH_SIZE):
+            batch = ids[start:start + FETCH_BATCH_SIZE]
+            found.update(self.index.fetch(ids=batch, namespace=self.namespace).vectors)
+        return found
+
+    def list_ids(self, prefix: str):
+        ids = []
+        for page in self.index.list(prefix=prefix, namespace=self.namespace):
+            # Pages hold `ListItem`s, not id strings
+            ids.extend(item.id for item in page.vectors if item.id)
+        return ids
+
+    def delete(self, ids=None, document_name=None):
+        if ids:
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                self.index.delete(ids=ids[start:start + DELETE_BATCH_SIZE], namespace=self.namespace)
+        if document_name:
+            self.index.delete(
+                namespace=self.namespace,
+                filter={
+                    "document_name":{
+                        "$eq":document_name
+                    }
+                }
+            )
+
+    def search(self, query: str, top_k: int = 5):
+        response = self.index.search(
+            namespace=self.namespace,
+            query={"inputs": {"text": query}, "top_k": top_k},
+            fields=["chunk_text", "document_name"],
+        )
+        return [
+            {"id": hit["_id"], "score": hit["_score"], **hit["fields"]}
+            for hit in response["result"]["hits"]
+        ]
+
+    def stats(self) -> dict:
+        return self.index.describe_index_stats().to_dict()
+
+    def drop(self):
+        get_pinecone().delete_index(self.index_name)
+        with _pinecone_lock:
+            _index_handles.pop(self.index_name, None)
+
+
+# ---------------------------------------------------------------------------
+# Local (in-process NumPy matrix, memory-mapped on disk)
+# ---------------------------------------------------------------------------
+
+class HashingEmbedder:
+    """
+    Dependency-free, offline text embedder (signed feature hashing of word
+    unigrams and bigrams, L2 normalised). Good enough for keyword-heavy
+    retrieval and tests; use `MistralEmbedder` for semantic quality.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class MistralEmbedder:
+    def __init__(self, model: str = None):
+        from mistralai import Mistral
+
+        self.model = model or cfg["models"]["mistral_embed_model"]
+        self.client = Mistral(api_key=cfg["keys"]["mistral_api_key"])
+        self.dim = None
+
+    def embed(self, texts):
+        response = self.client.embeddings.create(model=self.model, inputs=list(texts))
+        vectors = np.asarray([d.embedding for d in response.data], dtype=np.float32)
+        self.dim = vectors.shape[1]
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def top_k_rows(scores, rows, k):
+    """Rows of the `k` highest scores, best first."""
+    if len(rows) == 0:
+        return rows, scores
+    k = min(k, len(rows))
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best])]
+    return rows[best], scores[best]
+
+
+def brute_force_search(matrix, alive, query, k):
+    """Exact cosine search over every live row of `matrix`."""
+    scores = matrix @ query
+    rows = np.flatnonzero(alive)
+    return top_k_rows(scores[rows], rows, k)
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate search: rows are bucketed by their nearest
+    k-means centroid and a query only scans the `nprobe` closest buckets.
+    """
+
+    def __init__(self, nlist: int, nprobe: int = 16, iterations: int = 10, sample_size: int = 100_000, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.centroids = None
+        self.lists = []
+        self.trained_rows = 0
+
+    def _assign(self, vectors, block: int = 65536):
+        return np.concatenate([
+            np.argmax(vectors[start:start + block] @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), block)
+        ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+    def train(self, matrix):
+        """Spherical k-means on a sample, then bucket every row of `matrix`."""
+        n = len(matrix)
+        sample = matrix[np.sort(self.rng.choice(n, size=min(n, self.sample_size), replace=False))]
+        self.centroids = sample[self.rng.choice(len(sample), size=min(self.nlist, len(sample)), replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = self._assign(sample)
+            order = np.argsort(assignment, kind="stable")
+            used, starts = np.unique(assignment[order], return_index=True)
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            self.centroids[used] = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        assignment = self._assign(matrix)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(len(self.centroids) + 1))
+        self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(self.centroids))]
+        self.trained_rows = n
+
+    def add(self, rows, vectors):
+        for c in np.unique(assignment := self._assign(vectors)):
+            self.lists[c] = np.concatenate([self.lists[c], rows[assignment == c]])
+
+    def search(self, matrix, alive, query, k):
+        probe = np.argsort(-(self.centroids @ query))[:self.nprobe]
+        rows = np.concatenate([self.lists[c] for c in probe])
+        rows = rows[alive[rows]]
+        return top_k_rows(matrix[rows] @ query, rows, k)
+
+
+class LocalStore(VectorStore):
+    """
+    In-process vector store: float32 embeddings in a memory-mapped matrix
+    (`vectors.f32`) plus an SQLite sidecar (`records.sqlite`) with ids, text
+    and document names. Deletes are tombstones; re-upserting an id reuses
+    its row. `mode="ivf"` switches search to an `IVFIndex` once the store is
+    large enough, otherwise search is exact brute force.
+    """
+
+    INITIAL_CAPACITY = 1024
+    IVF_MIN_ROWS = 50_000
+
+    def __init__(self, path, embedder, mode: str = "flat", nlist: int = 0, nprobe: int = 16):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._open()
+
+    def _open(self):
+        with self._connect() as con:
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS records (
+                    row INTEGER PRIMARY KEY,
+                    id TEXT UNIQUE NOT NULL,
+                    document_name TEXT,
+                    chunk_text TEXT,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS records_document ON records(document_name)")
+            self.count = con.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM records").fetchone()[0]
+            dead = [r for (r,) in con.execute("SELECT row FROM records WHERE deleted = 1")]
+
+        self.ivf = None
+        self.matrix = None
+        self.dim = getattr(self.embedder, "dim", None)
+        self.alive = np.ones(self.count, dtype=bool)
+        self.alive[dead] = False
+
+        meta = self._read_meta()
+        if meta and self._vectors_file.exists():
+            self.dim = meta["dim"]
+            self._map(meta["capacity"])
+
+    @property
+    def _vectors_file(self):
+        return self.path / "vectors.f32"
+
+    def _read_meta(self):
+        meta = self.path / "meta.json"
+        return json.loads(meta.read_text()) if meta.exists() else None
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path / "records.sqlite", timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _map(self, capacity):
+        self.matrix = np.memmap(self._vectors_file, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        (self.path / "meta.json").write_text(json.dumps({"capacity": capacity, "dim": self.dim}))
+
+    def _ensure_capacity(self, rows):
+        capacity = len(self.matrix) if self.matrix is not None else 0
+        if rows <= capacity:
+            return
+        new_capacity = max(self.INITIAL_CAPACITY, capacity)
+        while new_capacity < rows:
+            new_capacity *= 2
+        if self.matrix is not None:
+            self.matrix.flush()
+            del self.matrix
+        with open(self._vectors_file, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._map(new_capacity)
+
+    def upsert_records(self, records):
+        records = list(records)
+        if not records:
+            return
+        vectors = self.embedder.embed([r["chunk_text"] for r in records])
+
+        with self._lock, self._connect() as con:
+            self.dim = self.dim or vectors.shape[1]
+            existing = dict(con.execute(
+                f"SELECT id, row FROM records WHERE id IN ({','.join('?' * len(records))})",
+                [r["id"] for r in records],
+            ).fetchall())
+
+            rows, new_rows = [], []
+            for record in records:
+                row = existing.get(record["id"])
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    existing[record["id"]] = row
+                    new_rows.append(row)
+                rows.append(row)
+            rows = np.asarray(rows)
+            new_rows = np.asarray(new_rows, dtype=np.int64)
+
+            self._ensure_capacity(self.count)
+            self.matrix[rows] = vectors
+            self.matrix.flush()
+            if len(self.alive) < self.count:
+                self.alive = np.concatenate([self.alive, np.ones(self.count - len(self.alive), dtype=bool)])
+            self.alive[rows] = True
+
+            con.executemany(
+                "INSERT OR REPLACE INTO records (row, id, document_name, chunk_text, deleted) VALUES (?, ?, ?, ?, 0)",
+                [(int(row), r["id"], r.get("document_name"), r["chunk_text"]) for row, r in zip(rows, records)],
+            )
+
+            if self.ivf is not None and len(new_rows):
+                self.ivf.add(new_rows, self.matrix[new_rows])
+
+    def fetch_ids(self, ids) -> set:
+        found = set()
+        with self._connect() as con:
+            for start in range(0, len(ids), 900):
+                batch = ids[start:start + 900]
+                found.update(i for (i,) in con.execute(
+                    f"SELECT id FROM records WHERE deleted = 0 AND id IN ({','.join('?' * len(batch))})", batch
+                ))
+        return found
+
+    def list_ids(self, prefix: str):
+        with self._connect() as con:
+            return [i for (i,) in con.execute(
+                "SELECT id FROM records WHERE deleted = 0 AND substr(id, 1, ?) = ?", (len(prefix), prefix)
+            )]
+
+    def delete(self, ids=None, document_name=None):
+        with self._lock, self._connect() as con:
+            rows = []
+            if ids:
+                for start in range(0, len(ids), 900):
+                    batch = ids[start:start + 900]
+                    rows += [r for (r,) in con.execute(
+                        f"SELECT row FROM records WHERE id IN ({','.join('?' * len(batch))})", batch
+                    )]
+            if document_name:
+                rows += [r for (r,) in con.execute("SELECT row FROM records WHERE document_name = ?", (document_name,))]
+            con.executemany("UPDATE records SET deleted = 1 WHERE row = ?", [(r,) for r in rows])
+            self.alive[rows] = False
+
+    def _ivf_ready(self):
+        if self.mode != "ivf" or self.count < self.IVF_MIN_ROWS:
+            return False
+        if self.ivf is None or self.count > 2 * self.ivf.trained_rows:
+            nlist = self.nlist or int(4 * np.sqrt(self.count))
+            self.ivf = IVFIndex(nlist=nlist, nprobe=self.nprobe)
+            self.ivf.train(self.matrix[:self.count])
+        return True
+
+    def search(self, query: str, top_k: int = 5):
+        if not self.count:
+            return []
+        q = self.embedder.embed([query])[0]
+        with self._lock:
+            matrix = self.matrix[:self.count]
+            if self._ivf_ready():
+                rows, scores = self.ivf.search(matrix, self.alive, q, top_k)
+            else:
+                rows, scores = brute_force_search(matrix, self.alive, q, top_k)
+
+        with self._connect() as con:
+            found = {row: (record_id, doc, text) for row, record_id, doc, text in con.execute(
+                f"SELECT row, id, document_name, chunk_text FROM records WHERE row IN ({','.join('?' * len(rows))})",
+                [int(r) for r in rows],
+            )}
+        return [
+            {"id": found[r][0], "score": float(s), "chunk_text": found[r][2], "document_name": found[r][1]}
+            for r, s in zip(rows.tolist(), scores.tolist()) if r in found
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local",
+            "mode": "ivf" if self.ivf is not None else "flat",
+            "dimension": self.dim,
+            "total_vector_count": int(self.alive.sum()),
+        }
+
+    def drop(self):
+        with self._lock:
+            self.matrix = None
+            for name in ("vectors.f32", "records.sqlite", "meta.json"):
+                (self.path / name).unlink(missing_ok=True)
+            self._open()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(backend: str, index_name: str, namespace: str) -> VectorStore:
+    """Process-wide store per (backend, index, namespace), built on first use."""
+    key = (backend, index_name, namespace)
+    with _stores_lock:
+        if key not in _stores:
+            if backend == "local":
+                path = Path(index_cfg.get("local_path", ".cache/vector_store"))
+                if not path.is_absolute():
+                    path = PROJECT_ROOT / path
+                embedder = (
+                    MistralEmbedder() if index_cfg.get("local_embedder") == "mistral"
+                    else HashingEmbedder(dim=index_cfg.get("local_dim", 384))
+                )
+                _stores[key] = LocalStore(
+                    path / index_name / namespace,
+                    embedder,
+                    mode=index_cfg.get("local_mode", "flat"),
+                    nlist=index_cfg.get("ivf_nlist", 0),
+                    nprobe=index_cfg.get("ivf_nprobe", 16),
+                )
+            else:
+                _stores[key] = PineconeStore(index_name, namespace)
+        return _stores[key]
@@ -8,12 +8,15 @@ template = ChatPromptTemplate.from_messages(
 You are an expert data analyst generating SQL for DuckDB.
 
 STRICT RULES:
-- There is ONLY ONE TABLE available
+- Query the main table; other tables exist ONLY if listed in the schema
+  (one per additional Excel sheet)
 - Table name is EXACT and CASE-SENSITIVE
 - You MUST use the table name exactly as provided
 - Do NOT invent or rename tables
 - Do NOT pluralize table names
 - Generate ONLY executable SQL
+- Column details (distinct counts, ranges, sample values) show how values
+  are written; match their spelling and format in filters
 
 Explain results in simple language.
 """
@@ -33,8 +36,8 @@ User question:
 {user_query}
 
 IMPORTANT:
-- Use ONLY the table name: {table_name}
-- Do NOT use any other table names
+- Use the table name: {table_name}
+- Do NOT use any table names that are not listed above
 
 Respond in this format:
 
@@ -0,0 +1,160 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+ATTACHMENT_SCHEME = "attachment://"
+DEFAULT_CHUNK_SIZE = 1024 * 1024          # 1 MB per read from the upload
+DEFAULT_SPOOL_SIZE = 8 * 1024 * 1024      # keep up to 8 MB in memory
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Attachment:
+    """
+    An uploaded file that is read exactly once, chunk by chunk.
+
+    Bytes go into a `SpooledTemporaryFile`: small uploads stay in an in-memory
+    buffer, large ones spill to an anonymous temp file. While open, the
+    attachment is registered under an `attachment://<id><suffix>` URI so the
+    agent tools can resolve it with `open_source` instead of a disk path.
+    """
+
+    def __init__(self, filename: str, spool_size: int = DEFAULT_SPOOL_SIZE):
+        self.filename = filename
+        self.suffix = Path(filename).suffix.lower()
+        self.uri = f"{ATTACHMENT_SCHEME}{uuid.uuid4().hex}{self.suffix}"
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._buffer = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        self._lock = threading.Lock()
+        self._path = None
+
+        with _registry_lock:
+            _registry[self.uri] = self
+
+    @classmethod
+    async def from_upload(cls, upload, chunk_size: int = DEFAULT_CHUNK_SIZE, spool_size: int = DEFAULT_SPOOL_SIZE):
+        """Stream a FastAPI `UploadFile` into a new attachment."""
+        attachment = cls(upload.filename, spool_size=spool_size)
+        while chunk := await upload.read(chunk_size):
+            attachment.write(chunk)
+        return attachment
+
+    @classmethod
+    def from_file(cls, fileobj, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE, spool_size: int = DEFAULT_SPOOL_SIZE):
+        """Copy any readable binary file object (e.g. a Streamlit upload)."""
+        attachment = cls(filename, spool_size=spool_size)
+        while chunk := fileobj.read(chunk_size):
+            attachment.write(chunk)
+        return attachment
+
+    def write(self, chunk: bytes):
+        self._buffer.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def in_memory(self) -> bool:
+        return not self._buffer._rolled
+
+    @contextmanager
+    def reader(self):
+        """Yield the underlying buffer rewound to the start (not closed on exit)."""
+        with self._lock:
+            self._buffer.seek(0)
+            yield self._buffer
+
+    def getvalue(self) -> bytes:
+        with self.reader() as f:
+            return f.read()
+
+    @contextmanager
+    def as_path(self):
+        """
+        Yield a real filesystem path for consumers that cannot read streams
+        (e.g. DuckDB's `read_csv_auto`). The file is written on first use and
+        reused until the attachment is closed.
+        """
+        if self._path is None:
+            with self.reader() as src, tempfile.NamedTemporaryFile(delete=False, suffix=self.suffix) as dst:
+                while chunk := src.read(DEFAULT_CHUNK_SIZE):
+                    dst.write(chunk)
+                self._path = dst.name
+        yield self._path
+
+    def close(self):
+        with _registry_lock:
+            _registry.pop(self.uri, None)
+        self._buffer.close()
+        if self._path and os.path.exists(self._path):
+            os.remove(self._path)
+        self._path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def get_attachment(uri: str) -> Attachment:
+    with _registry_lock:
+        attachment = _registry.get(str(uri).strip())
+    if attachment is None:
+        raise FileNotFoundError(f"Attachment not found or already closed: {uri}")
+    return attachment
+
+
+def is_attachment(source) -> bool:
+    return isinstance(source, Attachment) or (
+        isinstance(source, str) and source.strip().startswith(ATTACHMENT_SCHEME)
+    )
+
+
+@contextmanager
+def open_source(source):
+    """
+    Open a file source for binary reading. Accepts an `Attachment`, an
+    `attachment://` URI, raw bytes, an already open binary file object or a
+    filesystem path.
+    """
+    if is_attachment(source):
+        attachment = source if isinstance(source, Attachment) else get_attachment(source)
+        with attachment.reader() as f:
+            yield f
+    elif isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+    elif hasattr(source, "read"):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        yield source
+    else:
+        with open(source, "rb") as f:
+            yield f
+
+
+@contextmanager
+def source_path(source):
+    """Yield a filesystem path for `source`, materializing attachments on demand."""
+    if is_attachment(source):
+        attachment = source if isinstance(source, Attachment) else get_attachment(source)
+        with attachment.as_path() as path:
+            yield path
+    else:
+        yield str(source)
+
+
+def source_suffix(source) -> str:
+    if isinstance(source, Attachment):
+        return source.suffix
+    return Path(str(source)).suffix.lower()
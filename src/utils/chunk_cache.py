@@ -0,0 +1,122 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.utils.attachment import Attachment, get_attachment, is_attachment, open_source
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(source) -> str:
+    """SHA-256 of a file source; free for attachments, one streaming read otherwise."""
+    if is_attachment(source):
+        attachment = source if isinstance(source, Attachment) else get_attachment(source)
+        return attachment.sha256
+
+    digest = hashlib.sha256()
+    with open_source(source) as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        if hasattr(f, "seek"):
+            f.seek(0)
+    return digest.hexdigest()
+
+
+class ChunkCache:
+    """
+    Content-addressed cache of extracted PDF chunks in a single SQLite file.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the splitter
+    settings, so the same document uploaded under another name still hits.
+    Values are zlib-compressed JSON rows of `[page, chunk_index, text]`; ids
+    are rebuilt with the caller's file name. When the total stored size goes
+    over `max_bytes`, least recently used entries are evicted.
+    """
+
+    def __init__(self, path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    key TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS chunks_last_used ON chunks(last_used)")
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def key(sha256: str, chunk_size: int, chunk_overlap: int) -> str:
+        return f"{sha256}:{chunk_size}:{chunk_overlap}"
+
+    def get(self, key: str):
+        with self._connect() as con:
+            row = con.execute("SELECT payload FROM chunks WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE chunks SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, rows):
+        payload = zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock, self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO chunks (key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._evict(con)
+
+    def _evict(self, con):
+        total = con.execute("SELECT COALESCE(SUM(size), 0) FROM chunks").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in con.execute("SELECT key, size FROM chunks ORDER BY last_used").fetchall():
+            con.execute("DELETE FROM chunks WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM chunks")
+
+
+_chunk_cache = None
+_chunk_cache_lock = threading.Lock()
+
+
+def get_chunk_cache(cache_cfg: dict) -> ChunkCache:
+    """Process-wide cache instance built from the `cache` config section."""
+    global _chunk_cache
+    if _chunk_cache is None:
+        with _chunk_cache_lock:
+            if _chunk_cache is None:
+                path = Path(cache_cfg.get("chunk_cache_path", ".cache/chunks.sqlite"))
+                if not path.is_absolute():
+                    path = PROJECT_ROOT / path
+                _chunk_cache = ChunkCache(path, int(cache_cfg.get("chunk_cache_max_mb", 512)) * 1024 * 1024)
+    return _chunk_cache
@@ -0,0 +1,167 @@
+import re
+from itertools import islice
+
+from src.utils.attachment import open_source
+
+DEFAULT_BATCH_ROWS = 50_000
+
+# Arrow type -> DuckDB column type; anything else is loaded as text
+ARROW_TO_DUCKDB = {
+    "int64": "BIGINT",
+    "double": "DOUBLE",
+    "bool": "BOOLEAN",
+    "string": "VARCHAR",
+    "date32[day]": "DATE",
+    "time64[us]": "TIME",
+    "timestamp[us]": "TIMESTAMP",
+}
+WIDENING = {
+    frozenset({"BIGINT", "DOUBLE"}): "DOUBLE",
+    frozenset({"DATE", "TIMESTAMP"}): "TIMESTAMP",
+}
+
+
+def sheet_table_name(base: str, index: int, sheet_name: str, taken=()) -> str:
+    """
+    First sheet keeps `base`; later sheets become `base_<sheet name>`, with
+    a numeric suffix when that name is already in `taken` (sheet names
+    that only differ in case or punctuation give the same slug).
+    """
+    if index == 0:
+        return base
+    slug = re.sub(r"\W+", "_", sheet_name).strip("_").lower() or f"sheet{index + 1}"
+    name, n = f"{base}_{slug}", 1
+    while name in taken:
+        n += 1
+        name = f"{base}_{slug}_{n}"
+    return name
+
+
+def column_names(header):
+    names, seen = [], {}
+    for i, value in enumerate(header, start=1):
+        name = str(value).strip() if value is not None and str(value).strip() else f"column_{i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 1
+        names.append(name)
+    return names
+
+
+def widen(current, incoming):
+    if current is None or current == incoming:
+        return incoming
+    if incoming is None:
+        return current
+    return WIDENING.get(frozenset({current, incoming}), "VARCHAR")
+
+
+def arrow_batch(names, rows):
+    """Column-wise Arrow table for a batch of row tuples (mixed columns become text)."""
+    import pyarrow as pa
+
+    width = len(names)
+    columns = [[] for _ in range(width)]
+    for row in rows:
+        row = tuple(row[:width]) + (None,) * (width - len(row))
+        for column, value in zip(columns, row):
+            column.append(value)
+
+    arrays, types = [], []
+    for values in columns:
+        try:
+            array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            array = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+        if pa.types.is_null(array.type):
+            types.append(None)
+        else:
+            duck_type = ARROW_TO_DUCKDB.get(str(array.type))
+            if duck_type is None:
+                array = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+                duck_type = "VARCHAR"
+            types.append(duck_type)
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=names), types
+
+
+def load_sheet(con, table_name: str, rows, batch_rows: int = DEFAULT_BATCH_ROWS):
+    """
+    Stream worksheet rows (header first) into a new DuckDB table, one Arrow
+    batch at a time. Column types come from the data seen so far and are
+    widened in place (int -> double, date -> timestamp, otherwise text)
+    when a later batch disagrees, so memory stays bounded by one batch.
+    Returns the row count, or None (and creates nothing) for an empty sheet.
+    """
+    rows = (row for row in rows if row is not None and any(v is not None for v in row))
+    header = next(rows, None)
+    if header is None:
+        return None
+
+    names = column_names(header)
+    column_types = [None] * len(names)
+    created, count = False, 0
+    while batch_rows_list := list(islice(rows, batch_rows)):
+        batch, batch_types = arrow_batch(names, batch_rows_list)
+        con.register("_excel_batch", batch)
+        if not created:
+            columns = ", ".join(
+                f'CAST("{n}" AS {t or "VARCHAR"}) AS "{n}"' for n, t in zip(names, batch_types)
+            )
+            con.execute(f'CREATE TABLE "{table_name}" AS SELECT {columns} FROM _excel_batch')
+            column_types = list(batch_types)
+            created = True
+        else:
+            for i, (name, incoming) in enumerate(zip(names, batch_types)):
+                target = widen(column_types[i], incoming)
+                if target != column_types[i]:
+                    con.execute(f'ALTER TABLE "{table_name}" ALTER "{name}" TYPE {target}')
+                    column_types[i] = target
+            con.execute(f'INSERT INTO "{table_name}" SELECT * FROM _excel_batch')
+        con.unregister("_excel_batch")
+        count += len(batch_rows_list)
+
+    if not created:
+        columns = ", ".join(f'"{n}" VARCHAR' for n in names)
+        con.execute(f'CREATE TABLE "{table_name}" ({columns})')
+    return count
+
+
+def load_workbook_tables(con, source, base_name: str, batch_rows: int = DEFAULT_BATCH_ROWS):
+    """
+    Load every worksheet of an .xlsx source as its own DuckDB table using
+    openpyxl's read-only (streaming) reader. Returns `[(table, sheet_name)]`.
+    """
+    from openpyxl import load_workbook
+
+    tables = []
+    with open_source(source) as f:
+        workbook = load_workbook(f, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                table = sheet_table_name(base_name, len(tables), sheet.title, {t for t, _ in tables})
+                if load_sheet(con, table, sheet.iter_rows(values_only=True), batch_rows) is not None:
+                    tables.append((table, sheet.title))
+        finally:
+            workbook.close()
+    return tables
+
+
+def load_workbook_pandas(con, source, base_name: str):
+    """Previous path: every sheet through `pd.read_excel` (whole sheet in memory)."""
+    import pandas as pd
+
+    tables = []
+    with open_source(source) as f:
+        sheets = pd.read_excel(f, sheet_name=None)
+    for sheet_name, df in sheets.items():
+        if df.columns.empty:
+            continue
+        table = sheet_table_name(base_name, len(tables), sheet_name, {t for t, _ in tables})
+        con.register("_excel_frame", df)
+        con.execute(f'CREATE TABLE "{table}" AS SELECT * FROM _excel_frame')
+        con.unregister("_excel_frame")
+        tables.append((table, sheet_name))
+    return tables
@@ -1,4 +1,5 @@
 # log.py
+import os
 import sys
 from loguru import logger
 
@@ -14,7 +15,12 @@ class AppLogger:
         log_file: str = "logs/app.log",
         level: str = "INFO",
     ):
-        """Initialize logger configuration"""
+        """
+        Initialize logger configuration. `APP_LOG_FILE` overrides the file
+        path; set it to an empty string to log to the console only (tests,
+        benchmarks and one-off scripts).
+        """
+        log_file = os.environ.get("APP_LOG_FILE", log_file)
 
         # Remove default Loguru handler
         logger.remove()
@@ -39,18 +45,19 @@ class AppLogger:
         )
 
         # File logger (rotating)
-        logger.add(
-            log_file,
-            format=log_format,
-            level=level,
-            rotation="10 MB",
-            retention="14 days",
-            compression="zip",
-            enqueue=True,
-            backtrace=True,
-            diagnose=True,
-            catch=True,
-        )
+        if log_file:
+            logger.add(
+                log_file,
+                format=log_format,
+                level=level,
+                rotation="10 MB",
+                retention="14 days",
+                compression="zip",
+                enqueue=True,
+                backtrace=True,
+                diagnose=True,
+                catch=True,
+            )
 
         return logger
 
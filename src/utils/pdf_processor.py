@@ -1,9 +1,71 @@
-from langchain_community.document_loaders import PyPDFLoader
+import os
+import threading
+import multiprocessing
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from pypdf import PdfReader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.utils.attachment import open_source, source_path, is_attachment
+from src.utils.chunk_cache import ChunkCache, file_sha256, get_chunk_cache
+from config import get_config
+
+pdf_cfg = get_config().get("pdf", {})
+cache_cfg = get_config().get("cache", {})
+
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Shared process pool for page parsing. Uses the "spawn" start method so
+    workers never inherit locks from the threads of the web server.
+    """
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _process_pool_workers = workers
+        return _process_pool
+
+
+@lru_cache(maxsize=8)
+def _worker_processor(chunk_size, chunk_overlap):
+    return TextProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap, workers=0, use_cache=False)
+
+
+def _chunk_page_range(file_path, file_name, start, stop, chunk_size, chunk_overlap):
+    """Process-pool task: chunk pages `start..stop-1` (1-based) of a PDF on disk."""
+    processor = _worker_processor(chunk_size, chunk_overlap)
+    reader = PdfReader(file_path)
+    docs = []
+    for i in range(start, stop):
+        docs.extend(processor.page_chunks(file_name, i, reader.pages[i - 1].extract_text() or ""))
+    return docs
 
 
 class TextProcessor:
-    def __init__(self, chunk_size=1000, chunk_overlap=200):
+    def __init__(
+        self,
+        chunk_size=pdf_cfg.get("chunk_size", 1000),
+        chunk_overlap=pdf_cfg.get("chunk_overlap", 200),
+        workers=pdf_cfg.get("parallel_workers", 0),
+        pages_per_shard=pdf_cfg.get("pages_per_shard", 16),
+        use_cache=cache_cfg.get("chunk_cache", True),
+    ):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        # workers > 1 shards page ranges across a process pool (-1 = all cores)
+        self.workers = os.cpu_count() if workers == -1 else workers
+        self.pages_per_shard = pages_per_shard
+        self.use_cache = use_cache
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -19,22 +81,93 @@ class TextProcessor:
             ],
         )
 
-    def extract_text(self, file_path: str, file_name: str):
-        loader = PyPDFLoader(file_path)
-        documents = loader.load()
+    def iter_pages(self, file_path):
+        """
+        Lazily yield `(page_number, text)` pairs. `file_path` may be a path,
+        an `attachment://` URI or a binary stream; pypdf only parses a page
+        when it is reached, so memory is bounded by the current page.
+        """
+        with open_source(file_path) as f:
+            reader = PdfReader(f)
+            for i, page in enumerate(reader.pages, start=1):
+                yield i, page.extract_text() or ""
 
-        docs = []
-        for i, doc in enumerate(documents):
-            chunks = self.text_splitter.split_text(doc.page_content)
+    def page_chunks(self, file_name: str, page_number: int, text: str):
+        return [
+            {
+                "id": f"{file_name}-p{page_number}-c{j}",
+                "chunk_text": chunk,
+                "document_name": file_name
+            }
+            for j, chunk in enumerate(self.text_splitter.split_text(text), start=1)
+        ]
 
-            for j, chunk in enumerate(chunks):
-                docs.append({
-                    "id": f"{file_name}-p{i+1}-c{j+1}",
-                    "chunk_text": chunk,
+    def iter_chunks(self, file_path, file_name: str, workers=None):
+        """
+        Lazily yield chunk records, page by page, in document order.
+
+        With `workers > 1` page ranges are parsed in a process pool instead;
+        shards are merged in order, so ids and ordering are identical to the
+        sequential path.
+        """
+        if not self.use_cache:
+            yield from self._extract_chunks(file_path, file_name, workers)
+            return
+
+        # Content-addressed cache: the same bytes with the same splitter
+        # settings are never parsed twice, whatever the file is called.
+        cache = get_chunk_cache(cache_cfg)
+        key = ChunkCache.key(file_sha256(file_path), self.chunk_size, self.chunk_overlap)
+        rows = cache.get(key)
+        if rows is not None:
+            for page, index, text in rows:
+                yield {
+                    "id": f"{file_name}-p{page}-c{index}",
+                    "chunk_text": text,
                     "document_name": file_name
-                })
+                }
+            return
+
+        rows = []
+        for doc in self._extract_chunks(file_path, file_name, workers):
+            page, index = doc["id"][len(file_name) + 2:].split("-c")
+            rows.append([int(page), int(index), doc["chunk_text"]])
+            yield doc
+        # Only reached when the caller consumed the whole document
+        cache.put(key, rows)
+
+    def _extract_chunks(self, file_path, file_name, workers=None):
+        workers = self.workers if workers is None else workers
+        if workers and workers > 1 and (is_attachment(file_path) or isinstance(file_path, (str, Path))):
+            yield from self._iter_chunks_parallel(file_path, file_name, workers)
+            return
+
+        for i, text in self.iter_pages(file_path):
+            yield from self.page_chunks(file_name, i, text)
+
+    def _iter_chunks_parallel(self, file_path, file_name, workers):
+        with source_path(file_path) as path:
+            page_count = len(PdfReader(path).pages)
+            if page_count < 2 * self.pages_per_shard:
+                # Too small to amortize shipping work to other processes
+                for i, text in self.iter_pages(path):
+                    yield from self.page_chunks(file_name, i, text)
+                return
+
+            pool = get_process_pool(workers)
+            futures = [
+                pool.submit(
+                    _chunk_page_range, path, file_name, start,
+                    min(start + self.pages_per_shard, page_count + 1),
+                    self.chunk_size, self.chunk_overlap
+                )
+                for start in range(1, page_count + 1, self.pages_per_shard)
+            ]
+            for future in futures:
+                yield from future.result()
 
-        return docs
+    def extract_text(self, file_path, file_name: str):
+        return list(self.iter_chunks(file_path, file_name))
 
 # from pathlib import Path
 
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    In-memory LRU whose entries also expire `ttl` seconds after they were
+    stored. Bounded by entry count and, when `max_bytes` is set, by the
+    JSON size of the stored values, evicting least recently used first.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600, max_bytes: int = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (stored_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] >= self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value):
+        size = len(json.dumps(value, default=str)) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes and self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Whitespace and trailing punctuation do not change the SQL. Case is
+    kept: it can matter in string literals ("status = 'Open'").
+    """
+    return re.sub(r"\s+", " ", question).strip().rstrip("?.! ")
+
+
+def schema_hash(table_name: str, profiles: dict) -> str:
+    """
+    Hash of table names, column names and types only, so refreshed data
+    with the same layout (e.g. a new export of a dashboard file) reuses the
+    generated SQL.
+    """
+    layout = [table_name] + [
+        [table, [[c["name"], c["type"]] for c in profile]] for table, profile in profiles.items()
+    ]
+    return hashlib.sha256(json.dumps(layout).encode()).hexdigest()
+
+
+class QueryCache:
+    """
+    Two-level cache for the SQL tool: (normalized question, schema hash) ->
+    generated SQL skips the LLM; (SQL, table fingerprint) -> result rows
+    skips the scan. The table fingerprint is content based, so rows are
+    never served for changed data.
+    """
+
+    def __init__(self, sql_cfg: dict):
+        self.enabled = sql_cfg.get("query_cache", True)
+        self.sql = TTLCache(
+            max_entries=int(sql_cfg.get("sql_cache_max_entries", 1000)),
+            ttl=sql_cfg.get("sql_cache_ttl_seconds", 3600),
+        )
+        self.results = TTLCache(
+            max_entries=int(sql_cfg.get("result_cache_max_entries", 1000)),
+            ttl=sql_cfg.get("result_cache_ttl_seconds", 600),
+            max_bytes=int(sql_cfg.get("result_cache_max_mb", 64)) * 1024 * 1024,
+        )
+
+    def get_sql(self, question: str, schema_key: str):
+        return self.sql.get((normalize_question(question), schema_key)) if self.enabled else None
+
+    def put_sql(self, question: str, schema_key: str, sql: str):
+        if self.enabled:
+            self.sql.put((normalize_question(question), schema_key), sql)
+
+    def get_rows(self, sql: str, fingerprint: str):
+        return self.results.get((sql, fingerprint)) if self.enabled else None
+
+    def put_rows(self, sql: str, fingerprint: str, rows):
+        if self.enabled:
+            self.results.put((sql, fingerprint), rows)
+
+    def clear(self):
+        self.sql.clear()
+        self.results.clear()
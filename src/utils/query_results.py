@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from src.utils.query_cache import TTLCache
+from src.utils.table_cache import connect_database, connect_table, get_table_cache
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+EXPORT_FORMATS = {
+    "parquet": ("FORMAT parquet", "application/vnd.apache.parquet"),
+    "csv": ("FORMAT csv, HEADER", "text/csv"),
+}
+
+
+class ResultQueryError(Exception):
+    """DuckDB rejected a registered result's SQL when it ran again for a page or download."""
+
+
+def strip_sql(sql: str) -> str:
+    return sql.strip().rstrip(";").strip()
+
+
+def subquery(sql: str) -> str:
+    """`sql` on lines of its own, so a trailing `--` comment cannot swallow the wrapper."""
+    return f"(\n{strip_sql(sql)}\n)"
+
+
+def page_query(sql: str, limit: int, offset: int = 0) -> str:
+    """`sql` wrapped so DuckDB stops after `limit` rows; row order is kept."""
+    query = f"SELECT * FROM {subquery(sql)} AS _result LIMIT {int(limit)}"
+    return f"{query} OFFSET {int(offset)}" if offset else query
+
+
+def rows_within(rows, max_bytes: int):
+    """Leading rows whose JSON size stays under `max_bytes` (at least one row)."""
+    if not max_bytes:
+        return rows
+    total = 0
+    for i, row in enumerate(rows):
+        total += len(json.dumps(row, default=str)) + 2
+        if total > max_bytes and i > 0:
+            return rows[:i]
+    return rows
+
+
+def bounded_result(con, sql: str, max_rows: int, max_bytes: int = None, count_rows: bool = True) -> dict:
+    """
+    Run `sql` with a LIMIT of `max_rows + 1`, fetched as Arrow, and return
+    at most `max_rows` rows within `max_bytes` of JSON, plus a summary:
+    `row_count` (exact total; counted with a second pass only when the
+    result was cut, None when `count_rows` is off), `returned_rows` and
+    `truncated`, and `wrapped`. Statements that cannot be wrapped (PRAGMA,
+    EXPLAIN, CALL, ...) run as they are and only `max_rows + 1` rows are
+    fetched; they report `wrapped` False and cannot be paged later.
+    """
+    import duckdb
+
+    try:
+        table = con.execute(page_query(sql, max_rows + 1)).fetch_arrow_table()
+        columns, rows = table.column_names, table.to_pylist()
+        wrapped = True
+    except duckdb.ParserException:
+        cursor = con.execute(strip_sql(sql))
+        columns = [d[0] for d in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchmany(max_rows + 1)]
+        wrapped = False
+
+    fetched = len(rows)
+    rows = rows_within(rows[:max_rows], max_bytes)
+    truncated = fetched > len(rows)
+
+    row_count = fetched
+    if truncated:
+        row_count = None
+        if count_rows and wrapped:
+            row_count = con.execute(f"SELECT count(*) FROM {subquery(sql)} AS _result").fetchone()[0]
+    return {
+        "columns": columns,
+        "rows": rows,
+        "row_count": row_count,
+        "returned_rows": len(rows),
+        "truncated": truncated,
+        "wrapped": wrapped,
+    }
+
+
+class ResultStore:
+    """
+    Registry of executed queries by `result_id`, so a full result can be
+    paged or downloaded without going through the agent. Only the SQL and
+    where its table lives are kept (the cached DuckDB file, or the source
+    path when the table cache is off); the first page or download writes
+    the full result to Parquet (`materialize_result`). Entries expire after
+    `ttl` seconds.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600):
+        self._entries = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    @staticmethod
+    def result_id(sql: str, table_name: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{fingerprint}\n{table_name}\n{sql}".encode()).hexdigest()[:24]
+
+    def register(self, sql: str, source, table_name: str, fingerprint: str, sql_cfg: dict) -> str:
+        entry = {"sql": strip_sql(sql), "table_name": table_name}
+        if sql_cfg.get("table_cache", True):
+            entry["database"] = str(get_table_cache(sql_cfg).path(fingerprint))
+        else:
+            entry["source"] = str(source)
+        entry["result_id"] = self.result_id(entry["sql"], table_name, fingerprint)
+        self._entries.put(entry["result_id"], entry)
+        return entry["result_id"]
+
+    def get(self, result_id: str):
+        return self._entries.get(result_id)
+
+
+def open_result(entry: dict, sql_cfg: dict):
+    """DuckDB connection on which `entry["sql"]` can run again."""
+    if "database" in entry:
+        if not Path(entry["database"]).exists():
+            raise FileNotFoundError("The cached table behind this result was evicted")
+        return connect_database(entry["database"], entry["table_name"])
+    return connect_table(entry["source"], entry["table_name"], sql_cfg)
+
+
+def result_dir(sql_cfg: dict) -> Path:
+    directory = Path(sql_cfg.get("result_dir", ".cache/results"))
+    if not directory.is_absolute():
+        directory = PROJECT_ROOT / directory
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def remove_expired(directory: Path, ttl: float):
+    """Materialized results not read for `ttl` seconds (their entries have expired too)."""
+    cutoff = time.time() - ttl
+    for path in directory.glob("*.parquet"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+
+
+def materialize_result(entry: dict, sql_cfg: dict) -> Path:
+    """
+    Parquet file holding the full result of `entry`, written once (temp
+    file + rename) and shared by every page and download. Re-running the
+    SQL per page would let DuckDB return rows in a different order each
+    time, so OFFSET could skip or repeat rows. A read refreshes the file's
+    mtime; files idle longer than the result store TTL are removed.
+    Query failures are raised as `ResultQueryError`.
+    """
+    import duckdb
+
+    directory = result_dir(sql_cfg)
+    path = directory / f"{entry['result_id']}.parquet"
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        con = open_result(entry, sql_cfg)
+        try:
+            con.execute(f"COPY {subquery(entry['sql'])} TO '{tmp}' (FORMAT parquet)")
+        except duckdb.Error as e:
+            raise ResultQueryError(str(e)) from e
+        finally:
+            con.close()
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    remove_expired(directory, sql_cfg.get("result_store_ttl_seconds", 3600))
+    return path
+
+
+def fetch_page(entry: dict, offset: int, limit: int, sql_cfg: dict) -> dict:
+    """One page of a registered result; `next_offset` is None on the last page."""
+    import duckdb
+
+    path = materialize_result(entry, sql_cfg)
+    con = duckdb.connect(database=":memory:")
+    try:
+        query = page_query(f"SELECT * FROM read_parquet('{path}')", limit + 1, offset)
+        table = con.execute(query).fetch_arrow_table()
+    except duckdb.Error as e:
+        raise ResultQueryError(str(e)) from e
+    finally:
+        con.close()
+    rows = table.slice(0, limit).to_pylist()
+    return {
+        "columns": table.column_names,
+        "rows": rows,
+        "offset": offset,
+        "next_offset": offset + limit if table.num_rows > limit else None,
+    }
+
+
+def export_result(entry: dict, fmt: str, path, sql_cfg: dict):
+    """Write the full result to `path` as Parquet or CSV with DuckDB's COPY."""
+    import duckdb
+
+    options, _ = EXPORT_FORMATS[fmt]
+    source = materialize_result(entry, sql_cfg)
+    con = duckdb.connect(database=":memory:")
+    try:
+        con.execute(f"COPY (SELECT * FROM read_parquet('{source}')) TO '{path}' ({options})")
+    except duckdb.Error as e:
+        raise ResultQueryError(str(e)) from e
+    finally:
+        con.close()
+
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store(sql_cfg: dict) -> ResultStore:
+    """Process-wide result registry built from the `sql` config section."""
+    global _result_store
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                _result_store = ResultStore(
+                    max_entries=int(sql_cfg.get("result_store_max_entries", 1000)),
+                    ttl=sql_cfg.get("result_store_ttl_seconds", 3600),
+                )
+    return _result_store
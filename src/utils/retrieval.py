@@ -0,0 +1,76 @@
+import math
+import re
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from",
+    "how", "i", "in", "is", "it", "me", "of", "on", "or", "that", "the", "this",
+    "to", "was", "what", "when", "where", "which", "who", "why", "with", "you",
+}
+
+
+def tokenize(text: str):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (~4 characters per token), good enough for budgeting."""
+    return max(1, len(text) // 4)
+
+
+class BM25Ranker:
+    """
+    Okapi BM25 over an in-memory list of chunk records.
+
+    Chunks are the `{"id", "chunk_text", ...}` dicts produced by
+    `TextProcessor.iter_chunks`; only term counts are kept per chunk.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, docs):
+        query_terms = set(tokenize(query))
+        term_counts = [Counter(tokenize(doc["chunk_text"])) for doc in docs]
+        if not docs or not query_terms:
+            return [0.0] * len(docs)
+
+        n = len(docs)
+        avg_len = sum(sum(tc.values()) for tc in term_counts) / n or 1.0
+        df = Counter(term for tc in term_counts for term in query_terms if term in tc)
+        idf = {term: math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5)) for term in query_terms}
+
+        scores = []
+        for tc in term_counts:
+            length = sum(tc.values())
+            norm = self.k1 * (1 - self.b + self.b * length / avg_len)
+            scores.append(sum(
+                idf[term] * tc[term] * (self.k1 + 1) / (tc[term] + norm)
+                for term in query_terms if term in tc
+            ))
+        return scores
+
+    def top_k(self, query: str, docs, k: int = 8, max_tokens: int = None):
+        """
+        Best `k` chunks for `query`, highest score first; chunks that would
+        push the combined estimated size over `max_tokens` are skipped.
+        Falls back to the opening chunks of the document when nothing
+        matches the query.
+        """
+        docs = list(docs)
+        scores = self.score(query, docs)
+        ranked = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+        if not any(scores):
+            ranked = list(range(len(docs)))
+
+        selected, used = [], 0
+        for i in ranked[:k]:
+            cost = estimate_tokens(docs[i]["chunk_text"])
+            if max_tokens and selected and used + cost > max_tokens:
+                continue
+            used += cost
+            selected.append({**docs[i], "score": round(scores[i], 4)})
+        return selected
@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """
+    Bounded per-session state: an LRU of at most `max_sessions` entries whose
+    items also expire `ttl` seconds after their last use.
+
+    Each session maps to a plain dict the caller owns (e.g. the remote
+    multimodal conversation id and its turn count), so concurrent users
+    never share or grow one another's state.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()   # session_id -> (last_used, state)
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> dict:
+        """State for `session_id`, created empty when missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            _, state = self._sessions.pop(session_id, (now, None))
+            if state is None:
+                state = {}
+            self._sessions[session_id] = (now, state)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return state
+
+    def pop(self, session_id: str):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        return entry[1] if entry else None
+
+    def _expire(self, now):
+        # Least recently used first, so stop at the first live session
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if now - last_used < self.ttl:
+                break
+            del self._sessions[session_id]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
@@ -0,0 +1,235 @@
+import os
+import threading
+import uuid
+from pathlib import Path
+
+from src.utils.attachment import is_attachment, source_path, source_suffix
+from src.utils.chunk_cache import file_sha256
+from src.utils.excel_loader import load_workbook_pandas, load_workbook_tables
+from src.utils.table_profile import PROFILE_TABLE, profile_table, read_profiles, store_profiles
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CACHED_TABLE = "data"
+LOADER_VERSION = 3   # bump when the way files are loaded changes
+
+_path_hashes = {}   # (path, size, mtime_ns) -> sha256, skips re-hashing local files
+_path_hashes_lock = threading.Lock()
+
+
+def source_sha256(source) -> str:
+    """Content hash of `source`; local files are only hashed again once their size or mtime changes."""
+    if is_attachment(source) or not isinstance(source, (str, Path)):
+        return file_sha256(source)
+    stat = os.stat(source)
+    stamp = (str(source), stat.st_size, stat.st_mtime_ns)
+    with _path_hashes_lock:
+        digest = _path_hashes.get(stamp)
+    if digest is None:
+        digest = file_sha256(source)
+        with _path_hashes_lock:
+            if len(_path_hashes) > 1024:
+                _path_hashes.clear()
+            _path_hashes[stamp] = digest
+    return digest
+
+
+def load_tables(con, source, table_name: str, excel_engine: str = "openpyxl"):
+    """
+    Load a CSV/Excel source on an open DuckDB connection. CSV gives one
+    table; a workbook gives one table per sheet, the first named
+    `table_name` and the others `table_name_<sheet>`. Returns the table names.
+    """
+    suffix = source_suffix(source)
+    if suffix == ".csv":
+        with source_path(source) as csv_path:
+            con.execute(f"""
+                CREATE TABLE {table_name} AS
+                SELECT * FROM read_csv_auto('{csv_path}')
+            """)
+        return [table_name]
+    if suffix == ".xlsx":
+        loader = load_workbook_pandas if excel_engine == "pandas" else load_workbook_tables
+        return [table for table, _ in loader(con, source, table_name)]
+    raise ValueError(f"Unsupported structured file type: {suffix or source}")
+
+
+class TableCache:
+    """
+    Loaded tables persisted as DuckDB database files, keyed by file content.
+
+    The first question about a file parses it once into `<key>.duckdb`
+    (columnar, compressed) together with a per-table column profile used for
+    the SQL prompt; later questions about the same bytes, under any
+    name or upload, attach that file read-only instead of re-parsing. Entries
+    are written atomically (temp file + rename) and evicted least recently
+    used first once the directory grows over `max_bytes`; a hit refreshes
+    the file's mtime, which is what LRU order is based on.
+    """
+
+    def __init__(self, directory, max_bytes: int, excel_engine: str = "openpyxl", profile_samples: int = 3):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.excel_engine = excel_engine
+        self.profile_samples = profile_samples
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, source) -> str:
+        suffix = source_suffix(source).lstrip(".")
+        engine = f"-{self.excel_engine}" if suffix == "xlsx" else ""
+        return f"{source_sha256(source)}-{suffix}{engine}-v{LOADER_VERSION}"
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.duckdb"
+
+    def get_or_build(self, source, key: str = None) -> Path:
+        """
+        Path of the cached database for `source`, building it on a miss.
+        `key` is `self.key(source)` when the caller already computed it.
+        """
+        import duckdb
+
+        path = self.path(key or self.key(source))
+        try:
+            os.utime(path)   # hit: refresh its LRU position
+            return path
+        except FileNotFoundError:
+            pass
+
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            con = duckdb.connect(str(tmp))
+            try:
+                tables = load_tables(con, source, CACHED_TABLE, self.excel_engine)
+                store_profiles(con, tables, self.profile_samples)
+            finally:
+                con.close()
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._evict(keep=path)
+        return path
+
+    def connect(self, source, table_name: str, key: str = None):
+        """
+        In-memory DuckDB connection where `table_name` (and, for workbooks,
+        `table_name_<sheet>`) are views over the cached tables, so nothing is
+        copied and queries read columnar pages. Another thread can evict the
+        file between building and attaching it; it is then built again.
+        """
+        import duckdb
+
+        for attempt in range(3):
+            path = self.get_or_build(source, key)
+            try:
+                return connect_database(path, table_name)
+            except duckdb.IOException:
+                if attempt == 2 or path.exists():
+                    raise
+
+    def _evict(self, keep: Path = None):
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*.duckdb"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self):
+        with self._lock:
+            for path in self.directory.glob("*.duckdb"):
+                path.unlink(missing_ok=True)
+
+
+def connect_database(path, table_name: str):
+    """
+    In-memory DuckDB connection over a cached database file: `table_name`
+    (and `table_name_<sheet>`) are read-only views over its tables.
+    """
+    import duckdb
+
+    con = duckdb.connect(database=":memory:")
+    try:
+        con.execute(f"ATTACH '{path}' AS cached (READ_ONLY)")
+    except duckdb.Error:
+        con.close()
+        raise
+    cached_tables = [name for (name,) in con.execute(
+        "SELECT table_name FROM duckdb_tables() WHERE database_name = 'cached' "
+        "AND table_name <> ? ORDER BY table_name", [PROFILE_TABLE],
+    ).fetchall()]
+    for cached_table in cached_tables:
+        view = table_name + cached_table[len(CACHED_TABLE):]
+        con.execute(f'CREATE VIEW "{view}" AS SELECT * FROM cached."{cached_table}"')
+    return con
+
+
+_table_cache = None
+_table_cache_lock = threading.Lock()
+
+
+def get_table_cache(sql_cfg: dict) -> TableCache:
+    """Process-wide cache instance built from the `sql` config section."""
+    global _table_cache
+    if _table_cache is None:
+        with _table_cache_lock:
+            if _table_cache is None:
+                directory = Path(sql_cfg.get("table_cache_dir", ".cache/tables"))
+                if not directory.is_absolute():
+                    directory = PROJECT_ROOT / directory
+                _table_cache = TableCache(
+                    directory,
+                    int(sql_cfg.get("table_cache_max_mb", 2048)) * 1024 * 1024,
+                    excel_engine=sql_cfg.get("excel_engine", "openpyxl"),
+                    profile_samples=int(sql_cfg.get("profile_samples", 3)),
+                )
+    return _table_cache
+
+
+def connect_table(source, table_name: str, sql_cfg: dict, fingerprint: str = None):
+    """
+    DuckDB connection exposing `source` as `table_name`, cached when enabled.
+    Pass the `table_fingerprint` of `source` when it is already known, so
+    the file is not hashed twice.
+    """
+    if sql_cfg.get("table_cache", True):
+        return get_table_cache(sql_cfg).connect(source, table_name, fingerprint)
+
+    import duckdb
+
+    con = duckdb.connect(database=":memory:")
+    load_tables(con, source, table_name, sql_cfg.get("excel_engine", "openpyxl"))
+    return con
+
+
+def table_fingerprint(source, sql_cfg: dict) -> str:
+    """Content hash of `source` plus the loader settings, for caching query results."""
+    if sql_cfg.get("table_cache", True):
+        return get_table_cache(sql_cfg).key(source)
+    return f"{source_sha256(source)}-{sql_cfg.get('excel_engine', 'openpyxl')}-v{LOADER_VERSION}"
+
+
+def table_profiles(con, table_name: str, sql_cfg: dict):
+    """
+    `{table: column profile}` for the tables of a `connect_table` connection,
+    `table_name` first. Cached databases carry the profile computed at load
+    time; uncached connections are profiled on the spot.
+    """
+    profiles = read_profiles(con, "cached")
+    if profiles is not None:
+        profiles = {table_name + t[len(CACHED_TABLE):]: p for t, p in profiles.items()}
+    else:
+        samples = int(sql_cfg.get("profile_samples", 3))
+        tables = [t for (t,) in con.execute("SHOW TABLES").fetchall()]
+        profiles = {t: profile_table(con, t, samples) for t in tables}
+    return dict(sorted(profiles.items(), key=lambda item: item[0] != table_name))
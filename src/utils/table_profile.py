@@ -0,0 +1,147 @@
+import json
+import re
+
+PROFILE_TABLE = "__profile"
+SAMPLE_ROWS = 200
+MAX_VALUE_CHARS = 40
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "me", "of", "on", "or", "per", "show", "the", "to", "what", "which", "who", "with",
+}
+
+
+def short(value):
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    text = str(value)
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS - 3] + "..."
+
+
+def as_number(value, column_type: str):
+    """SUMMARIZE reports min/max as text; floating point ones are shortened."""
+    if value is not None and (column_type in ("DOUBLE", "FLOAT") or column_type.startswith("DECIMAL")):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            pass
+    return value
+
+
+def profile_table(con, table: str, samples: int = 3):
+    """
+    Per-column profile of `table`: type, approximate distinct count,
+    min/max, null percentage and a few sample values. One SUMMARIZE pass
+    plus a small leading sample, so it is cheap enough to run at load time.
+    """
+    summary = con.execute(f'SUMMARIZE "{table}"').fetchall()
+    cursor = con.execute(f'SELECT * FROM "{table}" LIMIT {SAMPLE_ROWS}')
+    names = [d[0] for d in cursor.description]
+    rows = cursor.fetchall()
+
+    sample_values = {}
+    for i, name in enumerate(names):
+        values = []
+        for row in rows:
+            value = short(row[i])
+            if value is not None and value not in values:
+                values.append(value)
+                if len(values) == samples:
+                    break
+        sample_values[name] = values
+
+    return [
+        {
+            "name": name,
+            "type": column_type,
+            "distinct": approx_unique,
+            "min": short(as_number(min_value, column_type)),
+            "max": short(as_number(max_value, column_type)),
+            "null_pct": float(null_pct) if null_pct is not None else None,
+            "samples": sample_values.get(name, []),
+        }
+        for name, column_type, min_value, max_value, approx_unique, *_, null_pct in summary
+    ]
+
+
+def store_profiles(con, tables, samples: int = 3):
+    """Write the profile of every table in `tables` into PROFILE_TABLE."""
+    con.execute(f'CREATE TABLE "{PROFILE_TABLE}" (table_name VARCHAR, profile VARCHAR)')
+    for table in tables:
+        con.execute(
+            f'INSERT INTO "{PROFILE_TABLE}" VALUES (?, ?)',
+            [table, json.dumps(profile_table(con, table, samples))],
+        )
+
+
+def read_profiles(con, schema: str):
+    """`{table: profile}` from a PROFILE_TABLE in `schema`, or None if there is none."""
+    exists = con.execute(
+        "SELECT count(*) FROM duckdb_tables() WHERE database_name = ? AND table_name = ?",
+        [schema, PROFILE_TABLE],
+    ).fetchone()[0]
+    if not exists:
+        return None
+    rows = con.execute(f'SELECT table_name, profile FROM {schema}."{PROFILE_TABLE}"').fetchall()
+    return {table: json.loads(profile) for table, profile in rows}
+
+
+def tokens(text: str):
+    """Lower-case word tokens, splitting camelCase and snake_case, plural `s` dropped."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", str(text))
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return {w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words} - STOPWORDS
+
+
+def relevance(column: dict, question_tokens: set, question: str) -> int:
+    name_tokens = tokens(column["name"])
+    score = 3 * len(name_tokens & question_tokens)
+    score += sum(
+        1 for n in name_tokens for q in question_tokens
+        if n != q and len(n) >= 4 and len(q) >= 4 and (n in q or q in n)
+    )
+    if any(len(v) >= 3 and v.lower() in question for v in column["samples"]):
+        score += 2
+    return score
+
+
+def prune_columns(profile, question: str, max_columns: int):
+    """
+    The `max_columns` columns most related to `question` (name overlap,
+    partial matches, sample values mentioned in it), in table order. Ties
+    go to earlier columns, so an unrelated question still gets the leading
+    columns. Tables that fit are returned whole.
+    """
+    if not max_columns or len(profile) <= max_columns:
+        return list(profile)
+    question_tokens = tokens(question)
+    question = question.lower()
+    ranked = sorted(
+        range(len(profile)),
+        key=lambda i: (-relevance(profile[i], question_tokens, question), i),
+    )
+    keep = sorted(ranked[:max_columns])
+    return [profile[i] for i in keep]
+
+
+def describe_column(column: dict) -> str:
+    details = [f"~{column['distinct']} distinct"] if column["distinct"] is not None else []
+    if column["min"] is not None and column["type"] != "VARCHAR":
+        details.append(f"range {column['min']} .. {column['max']}")
+    if column["null_pct"]:
+        details.append(f"{column['null_pct']:g}% null")
+    if column["samples"] and column["type"] in ("VARCHAR", "BOOLEAN"):
+        details.append("e.g. " + ", ".join(repr(v) for v in column["samples"]))
+    return f"{column['name']} ({column['type']})" + (f": {'; '.join(details)}" if details else "")
+
+
+def format_schema(profile, question: str, max_columns: int) -> str:
+    """Schema text for the SQL prompt, limited to the columns relevant to `question`."""
+    columns = prune_columns(profile, question, max_columns)
+    lines = [describe_column(c) for c in columns]
+    omitted = len(profile) - len(columns)
+    if omitted:
+        lines.append(f"({omitted} less relevant columns omitted)")
+    return "\n".join(lines)
@@ -1,21 +1,44 @@
 # streamlit_app.py
 import os
-import tempfile
 from pathlib import Path
 import re
+import time
+import uuid
 from PIL import Image
 from io import BytesIO
 from mistralai import Mistral
 import streamlit as st
 from src.llm.agent_inference import CreateAgent
+from src.llm.hooks import InferenceHooks, MetricsHooks
+from src.utils.attachment import Attachment
 from src.utils.log import AppLogger
-from config import get_config
+from config import get_config, reload_config, config_fingerprint
 
+rerun_started = time.perf_counter()
 cfg=get_config()
 logger = AppLogger.setup()
+ui_cfg = cfg.get("streamlit", {})
+RESOURCE_TTL = ui_cfg.get("resource_ttl_seconds") or None   # None = keep until config changes
 
-mistral_api_key = cfg["keys"]["mistral_api_key"]
-client = Mistral(api_key=mistral_api_key)
+
+# --------------------------
+# Cached resources
+# --------------------------
+# Streamlit re-executes this script on every interaction. The heavy objects
+# below are built once per process and shared by all sessions; each loader
+# is keyed by the config fingerprint, so editing the config files rebuilds
+# them on the next rerun (max_entries=1 drops the previous version).
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_config(config_version: str) -> dict:
+    return reload_config()
+
+@st.cache_resource(max_entries=1, ttl=RESOURCE_TTL, show_spinner="Loading agent...")
+def load_agent(config_version: str) -> CreateAgent:
+    return CreateAgent()
+
+@st.cache_resource(max_entries=1, ttl=RESOURCE_TTL, show_spinner=False)
+def load_mistral_client(config_version: str) -> Mistral:
+    return Mistral(api_key=get_config()["keys"]["mistral_api_key"])
 
 # --- Blue theme CSS ---
 st.markdown(
@@ -52,8 +75,12 @@ st.markdown("You can send **text, PDF, image, audio, structured files** files an
 logger.info("Streamlit Running...")
 
 
-# Initialize agent
-agent = CreateAgent()
+# Initialize agent (cached across reruns)
+config_version = config_fingerprint()
+load_config(config_version)
+agent = load_agent(config_version)
+client = load_mistral_client(config_version)
+setup_ms = (time.perf_counter() - rerun_started) * 1000
 os.environ["LANGSMITH_TRACING"] = "true"
 
 st.sidebar.header("Assistant Settings")
@@ -77,6 +104,9 @@ st.session_state.system_prompt_type = selected_prompt_type
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
 # --------------------------
 # Helper functions
 # --------------------------
@@ -94,55 +124,114 @@ def detect_attachment_type(file_path: Path) -> str:
         return "excel"
     return "unknown"
 
-def save_temp_file(file) -> Path:
-    suffix = Path(file.name).suffix
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    tmp.write(file.read())
-    tmp.close()
-    return Path(tmp.name)
+def load_attachment(file) -> Attachment:
+    file.seek(0)
+    return Attachment.from_file(file, file.name)
+
+class StreamlitHooks(InferenceHooks):
+    """Surfaces agent progress in the UI (runs in the script thread)."""
+
+    def on_start(self, query, session_id=None):
+        st.toast("Inference Started!",icon="🎉")
+
+    def on_tool_call(self, name, args):
+        st.toast(f"Calling {name}", icon="🛠️")
+
+    def on_error(self, error):
+        st.error(f"Inference failed: {error}")
+
+IMAGE_MARKER = "file_id:"
+
+def shown_until(text):
+    """
+    How much of a partial answer can be shown: everything before an image
+    marker (`![...](file_id:...)` or `file_id:...`), including one that may
+    still be arriving split across tokens.
+    """
+    end = text.find(IMAGE_MARKER)
+    if end < 0:
+        end = len(text)
+        for n in range(min(len(IMAGE_MARKER) - 1, len(text)), 0, -1):
+            if text.endswith(IMAGE_MARKER[:n]):
+                end -= n
+                break
+    image = text.rfind("![", 0, end)
+    if image >= 0 and ")" not in text[image:end]:
+        end = image
+    elif text[:end].endswith("!"):
+        end -= 1
+    return end
+
+def token_stream(events, answer):
+    """
+    Feed model tokens to `st.write_stream` (falls back to the final answer).
+    Image markers are held back, since the downloaded image replaces them;
+    the full text is appended to `answer`.
+    """
+    text, shown = "", 0
+    for event in events:
+        if event["type"] == "token":
+            text += event["content"]
+        elif event["type"] == "final" and not text:
+            text = event["content"]
+        else:
+            continue
+        end = shown_until(text)
+        if end > shown:
+            yield text[shown:end]
+            shown = end
+    answer.append(text)
+    if IMAGE_MARKER not in text and len(text) > shown:
+        yield text[shown:]
 
 def process_input(prompt, uploaded_file=None):
     with st.chat_message("user"):
         st.markdown(prompt)
     st.session_state.chat_history.append({"role": "user", "content": prompt})
     logger.info(f"Inference Starting")
-    temp_path = None
+    attachment = None
     response = ""
     try:
         file_args = {"image_path": None, "audio_path": None, "pdf_path": None, "filename": None, "csv_path":None, "xlsx_path":None, "table_name":None}
         if uploaded_file:
-            temp_path = save_temp_file(uploaded_file)
-            attachment_type = detect_attachment_type(temp_path)
+            attachment = load_attachment(uploaded_file)
+            attachment_type = detect_attachment_type(Path(uploaded_file.name))
             st.toast(f"{uploaded_file.name} Attached",icon="🎉")
             
             if attachment_type == "unknown":
                 st.error("Unsupported attachment type.")
                 logger.error(f"Unsupported attachment type.")
             elif attachment_type == "pdf":
-                file_args["pdf_path"] = temp_path
+                file_args["pdf_path"] = attachment.uri
                 file_args["filename"] = str(uploaded_file.name).replace(".pdf","")
             elif attachment_type == "image":
-                file_args["image_path"] = temp_path
+                file_args["image_path"] = attachment.uri
             elif attachment_type == "audio":
-                file_args["audio_path"] = temp_path
+                file_args["audio_path"] = attachment.uri
             elif attachment_type =="csv":
-                file_args["csv_path"]=temp_path
+                file_args["csv_path"]=attachment.uri
                 file_args["table_name"]=str(uploaded_file.name).replace(".csv","")
             elif attachment_type =="excel":
-                file_args["xlsx_path"]=temp_path
+                file_args["xlsx_path"]=attachment.uri
                 file_args["table_name"]=str(uploaded_file.name).replace(".xlsx","")
 
         logger.info(f" Temp File Path: {file_args}")
-        # Single inference call handling all types
-        response = agent.query_inference(prompt,system_prompt_type=st.session_state.system_prompt_type, **file_args)
-        st.balloons()
-        logger.success("Inference Completed")
-        logger.success(response)
         # Regex patterns
         markdown_pattern = r'!\[.*\]\(file_id:([a-f0-9\-]+)\)'
         plain_pattern = r'file_id:([a-f0-9\-]+)'
 
         with st.chat_message("assistant"):
+            # Single streaming inference call handling all types
+            events = agent.stream_inference(prompt,system_prompt_type=st.session_state.system_prompt_type, session_id=st.session_state.session_id, hooks=[StreamlitHooks(), MetricsHooks()], **file_args)
+            answer = []
+            streamed = st.empty()
+            with streamed.container():
+                st.write_stream(token_stream(events, answer))
+            response = "".join(answer)
+            st.balloons()
+            logger.success("Inference Completed")
+            logger.success(response)
+
             # First try Markdown pattern
             match = re.search(markdown_pattern, response)
             
@@ -152,6 +241,8 @@ def process_input(prompt, uploaded_file=None):
             
             if match:
                 file_id = match.group(1)
+                # The image and its caption replace the streamed text
+                streamed.empty()
                 
                 # Remove any file_id line from the description
                 description = re.sub(markdown_pattern, '', response)
@@ -165,13 +256,10 @@ def process_input(prompt, uploaded_file=None):
                     st.image(image_bytes, caption=description, width=600)
                 except:
                     st.markdown(f"Due some technical issue unable to download image of {description}")
-            else:
-                # No file_id found, just show the response
-                st.markdown(response)
 
     finally:
-        if temp_path and temp_path.exists():
-            temp_path.unlink()
+        if attachment:
+            attachment.close()
     
     st.session_state.chat_history.append({"role": "assistant", "content": response})
 
@@ -212,3 +300,17 @@ if not st.session_state.chat_history:
 # --------------------------
 if query := st.chat_input("Ask your question here:"):
     process_input(query, uploaded_file=uploaded_file)
+
+# --------------------------
+# Rerun latency
+# --------------------------
+rerun_ms = (time.perf_counter() - rerun_started) * 1000
+timings = st.session_state.setdefault("rerun_timings", [])
+timings.append(rerun_ms)
+del timings[:-50]
+logger.info(f"rerun took {rerun_ms:.1f} ms (resources {setup_ms:.1f} ms)")
+if ui_cfg.get("show_rerun_latency", True):
+    st.sidebar.caption(
+        f"Rerun {rerun_ms:.0f} ms · resources {setup_ms:.0f} ms · "
+        f"median of last {len(timings)}: {sorted(timings)[len(timings) // 2]:.0f} ms"
+    )
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Tests log to the console only, never to the tracked logs/app.log
+os.environ.setdefault("APP_LOG_FILE", "")
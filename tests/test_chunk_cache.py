@@ -0,0 +1,66 @@
+import hashlib
+import itertools
+import os
+
+import pytest
+
+from src.utils import chunk_cache
+from src.utils.chunk_cache import ChunkCache, file_sha256
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing `time.time()` so LRU order does not depend on timer resolution."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(chunk_cache.time, "time", lambda: float(next(ticks)))
+
+
+def rows(seed: int, size: int = 2000):
+    # Random text compresses badly, so payload sizes stay predictable
+    return [[1, 0, os.urandom(size).hex()], [2, 1, f"seed {seed}"]]
+
+
+def test_round_trip(tmp_path):
+    cache = ChunkCache(tmp_path / "chunks.sqlite", max_bytes=10 * 1024 * 1024)
+    key = ChunkCache.key("abc", 1000, 100)
+    assert cache.get(key) is None
+    cache.put(key, [[1, 0, "hello"], [1, 1, "world"]])
+    assert cache.get(key) == [[1, 0, "hello"], [1, 1, "world"]]
+
+
+def test_key_includes_splitter_settings():
+    assert ChunkCache.key("abc", 1000, 100) != ChunkCache.key("abc", 1000, 200)
+    assert ChunkCache.key("abc", 1000, 100) != ChunkCache.key("abc", 500, 100)
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = ChunkCache(tmp_path / "chunks.sqlite", max_bytes=5000)   # room for two entries of ~2.3 KB
+    cache.put("a", rows(1))
+    cache.put("b", rows(2))
+    assert cache.get("a") is not None   # "a" is now more recent than "b"
+    cache.put("c", rows(3))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_oversized_entry_is_not_stored(tmp_path):
+    cache = ChunkCache(tmp_path / "chunks.sqlite", max_bytes=1000)
+    cache.put("big", rows(1, size=5000))
+    assert cache.get("big") is None
+
+
+def test_clear(tmp_path):
+    cache = ChunkCache(tmp_path / "chunks.sqlite", max_bytes=10 * 1024 * 1024)
+    cache.put("a", rows(1))
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_file_sha256_matches_hashlib(tmp_path):
+    data = os.urandom(3 * chunk_cache.HASH_CHUNK_SIZE + 17)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+    expected = hashlib.sha256(data).hexdigest()
+    assert file_sha256(str(path)) == expected
+    assert file_sha256(data) == expected
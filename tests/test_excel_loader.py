@@ -0,0 +1,92 @@
+import datetime
+
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+from src.utils.excel_loader import column_names, load_sheet, load_workbook_tables, sheet_table_name, widen
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect(database=":memory:")
+    yield con
+    con.close()
+
+
+def column_types(con, table):
+    return dict(con.execute(
+        "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = ?", [table]
+    ).fetchall())
+
+
+def test_column_names_fill_blanks_and_dedupe():
+    assert column_names(["id", None, " ", "id", "id"]) == ["id", "column_2", "column_3", "id_2", "id_3"]
+
+
+def test_widen():
+    assert widen(None, "BIGINT") == "BIGINT"
+    assert widen("BIGINT", None) == "BIGINT"
+    assert widen("BIGINT", "DOUBLE") == "DOUBLE"
+    assert widen("DATE", "TIMESTAMP") == "TIMESTAMP"
+    assert widen("BIGINT", "VARCHAR") == "VARCHAR"
+
+
+def test_types_widen_across_batches(con):
+    rows = [
+        ("amount", "day", "code"),
+        (1, datetime.date(2024, 1, 1), 10),
+        (2, datetime.date(2024, 1, 2), 20),
+        (2.5, datetime.datetime(2024, 1, 3, 12, 30), "x-30"),
+    ]
+    assert load_sheet(con, "t", iter(rows), batch_rows=2) == 3
+    assert column_types(con, "t") == {"amount": "DOUBLE", "day": "TIMESTAMP", "code": "VARCHAR"}
+    assert con.execute("SELECT amount, code FROM t ORDER BY amount").fetchall() == [
+        (1.0, "10"), (2.0, "20"), (2.5, "x-30"),
+    ]
+
+
+def test_all_null_first_batch_takes_type_from_later_rows(con):
+    rows = [("id", "note"), (1, None), (2, None), (3, "late")]
+    load_sheet(con, "t", iter(rows), batch_rows=2)
+    assert column_types(con, "t") == {"id": "BIGINT", "note": "VARCHAR"}
+
+
+def test_short_rows_are_padded(con):
+    load_sheet(con, "t", iter([("a", "b", "c"), (1,), (2, 3, 4)]))
+    assert con.execute("SELECT * FROM t ORDER BY a").fetchall() == [(1, None, None), (2, 3, 4)]
+
+
+def test_empty_and_header_only_sheets(con):
+    assert load_sheet(con, "empty", iter([(None, None), ()])) is None
+    assert load_sheet(con, "header", iter([("a", "b")])) == 0
+    tables = {t for (t,) in con.execute("SHOW TABLES").fetchall()}
+    assert tables == {"header"}
+
+
+def test_sheet_slug_collisions_get_a_suffix():
+    taken = {"data", "data_sales"}
+    assert sheet_table_name("data", 0, "Anything") == "data"
+    assert sheet_table_name("data", 1, "Q1 Sales!") == "data_q1_sales"
+    assert sheet_table_name("data", 2, "SALES", taken) == "data_sales_2"
+    assert sheet_table_name("data", 3, "sales", taken | {"data_sales_2"}) == "data_sales_3"
+    assert sheet_table_name("data", 4, "***") == "data_sheet5"
+
+
+def test_workbook_loads_every_non_empty_sheet(con, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Summary"
+    workbook.active.append(["total"])
+    workbook.active.append([3])
+    workbook.create_sheet("Blank")
+    for title in ("Sales", "sales "):
+        sheet = workbook.create_sheet(title)
+        sheet.append(["id"])
+        sheet.append([1])
+    path = tmp_path / "book.xlsx"
+    workbook.save(path)
+
+    tables = load_workbook_tables(con, str(path), "data")
+    assert tables == [("data", "Summary"), ("data_sales", "Sales"), ("data_sales_2", "sales ")]
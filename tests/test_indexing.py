@@ -0,0 +1,115 @@
+import pytest
+
+from benchmarks.bench_pdf_parallel import write_pdf
+from src.llm import manifest, vector_store
+from src.llm.indexing import Indexing
+from src.utils.pdf_processor import TextProcessor
+
+
+class EditableProcessor(TextProcessor):
+    """Chunks come from `pages` (page number -> chunk texts) instead of a parsed PDF."""
+
+    def __init__(self, pages):
+        super().__init__(use_cache=False)
+        self.pages = pages
+
+    def iter_chunks(self, file_path, file_name, workers=None):
+        for page, chunks in self.pages.items():
+            for index, text in enumerate(chunks):
+                yield {"id": f"{file_name}-p{page}-c{index}", "chunk_text": text, "document_name": file_name}
+
+
+@pytest.fixture
+def local_backend(tmp_path, monkeypatch):
+    """`backend="local"` with the vector store and manifest under `tmp_path`."""
+    monkeypatch.setitem(vector_store.index_cfg, "local_path", str(tmp_path / "vectors"))
+    monkeypatch.setitem(vector_store.index_cfg, "local_embedder", "hashing")
+    monkeypatch.setitem(manifest.index_cfg, "manifest_path", str(tmp_path / "manifest.sqlite"))
+    monkeypatch.setattr(vector_store, "_stores", {})
+    monkeypatch.setattr(manifest, "_manifests", {})
+
+
+def upserted_ids(monkeypatch, indexing):
+    """Ids sent to the store from now on."""
+    ids = []
+    upsert_records = indexing.store.upsert_records
+
+    def recording_upsert(records):
+        ids.extend(r["id"] for r in records)
+        upsert_records(records)
+
+    monkeypatch.setattr(indexing.store, "upsert_records", recording_upsert)
+    return ids
+
+
+def test_reinserting_same_pdf_upserts_nothing(tmp_path, local_backend, monkeypatch):
+    pdf = tmp_path / "report.pdf"
+    write_pdf(str(pdf), pages=2, lines_per_page=10)
+    indexing = Indexing(TextProcessor(use_cache=False), backend="local")
+
+    first = indexing.insert_doc(str(pdf), "report.pdf")
+    assert first["records"] == first["chunks"] > 0
+
+    ids = upserted_ids(monkeypatch, indexing)
+    second = indexing.insert_doc(str(pdf), "report.pdf")
+    assert ids == []
+    assert (second["records"], second["unchanged"], second["stale_deleted"]) == (0, first["chunks"], 0)
+
+
+def test_force_resends_every_chunk(tmp_path, local_backend):
+    pdf = tmp_path / "report.pdf"
+    write_pdf(str(pdf), pages=1, lines_per_page=10)
+    indexing = Indexing(TextProcessor(use_cache=False), backend="local")
+    first = indexing.insert_doc(str(pdf), "report.pdf")
+    assert indexing.insert_doc(str(pdf), "report.pdf", force=True)["records"] == first["chunks"]
+
+
+def test_changed_chunk_is_the_only_upsert(local_backend, monkeypatch):
+    processor = EditableProcessor({1: ["alpha text", "beta text"], 2: ["gamma text"]})
+    indexing = Indexing(processor, backend="local")
+    indexing.insert_doc("unused.pdf", "doc.pdf")
+
+    processor.pages[1][1] = "beta text, revised"
+    ids = upserted_ids(monkeypatch, indexing)
+    job = indexing.insert_doc("unused.pdf", "doc.pdf")
+    assert ids == ["doc.pdf-p1-c1"]
+    assert (job["chunks"], job["unchanged"]) == (3, 2)
+    assert indexing.search("revised", top_k=1)[0]["id"] == "doc.pdf-p1-c1"
+
+
+def test_vanished_chunks_are_deleted(local_backend):
+    processor = EditableProcessor({1: ["alpha text", "beta text"], 2: ["gamma text"]})
+    indexing = Indexing(processor, backend="local")
+    indexing.insert_doc("unused.pdf", "doc.pdf")
+
+    del processor.pages[2]
+    job = indexing.insert_doc("unused.pdf", "doc.pdf")
+    assert job["stale_deleted"] == 1
+    assert indexing.store.list_ids("doc.pdf-p") == ["doc.pdf-p1-c0", "doc.pdf-p1-c1"]
+    assert sorted(indexing.manifest.chunk_ids("doc.pdf")) == ["doc.pdf-p1-c0", "doc.pdf-p1-c1"]
+
+
+def test_delete_doc_empties_store_and_manifest(local_backend):
+    processor = EditableProcessor({1: ["alpha text", "beta text"]})
+    indexing = Indexing(processor, backend="local")
+    indexing.insert_doc("unused.pdf", "doc.pdf")
+    indexing.insert_doc("unused.pdf", "other.pdf")
+
+    job = indexing.delete_doc("doc.pdf", wait=True, timeout=1)
+    assert job["visible"] and job["records"] == 2
+    assert indexing.store.list_ids("doc.pdf-p") == []
+    assert not indexing.manifest.has_document("doc.pdf")
+    assert indexing.list_doc_ids("other.pdf") == ["other.pdf-p1-c0", "other.pdf-p1-c1"]
+
+
+def test_delete_doc_without_manifest_entry_lists_ids(local_backend):
+    indexing = Indexing(EditableProcessor({}), backend="local")
+    # Indexed before the manifest existed: only the store knows the ids
+    indexing.store.upsert_records([
+        {"id": "old.pdf-p1-c0", "chunk_text": "legacy", "document_name": "old.pdf"},
+        {"id": "old.pdf-p10-c0", "chunk_text": "legacy", "document_name": "old.pdf"},
+        {"id": "old.pdf-plan", "chunk_text": "not a chunk id", "document_name": "other"},
+    ])
+    assert sorted(indexing.list_doc_ids("old.pdf")) == ["old.pdf-p1-c0", "old.pdf-p10-c0"]
+    indexing.delete_doc("old.pdf")
+    assert indexing.store.list_ids("old.pdf-p") == ["old.pdf-plan"]
@@ -0,0 +1,141 @@
+import pytest
+
+from src.llm import ingestion
+from src.llm.ingestion import IngestionQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ingestion.time, "time", lambda: now[0])
+    return now
+
+
+def make_queue(tmp_path, runner=None, lease_seconds=60):
+    """Queue on a shared SQLite file; tests drive `_claim`/`_run` themselves, no threads."""
+    return IngestionQueue(
+        tmp_path / "ingestion.sqlite", tmp_path / "uploads", runner or (lambda job, progress: {"ok": True}),
+        lease_seconds=lease_seconds,
+    )
+
+
+def upload(queue, name="doc.pdf", **kwargs):
+    job_id = queue.new_job_id()
+    path = queue.upload_path(job_id)
+    path.write_bytes(b"%PDF-1.4")
+    return queue.enqueue(name, path, job_id=job_id, **kwargs), path
+
+
+def test_claims_oldest_job_once(tmp_path, clock):
+    queue = make_queue(tmp_path)
+    first, _ = upload(queue, "a.pdf")
+    clock[0] += 1
+    upload(queue, "b.pdf")
+
+    claimed = queue._claim()
+    assert claimed["id"] == first["id"]
+    assert (claimed["status"], claimed["owner"], claimed["lease_until"]) == ("running", queue.owner, 1061.0)
+    # Another process sharing the file gets the next job, never the same one
+    assert make_queue(tmp_path)._claim()["document_name"] == "b.pdf"
+    assert queue._claim() is None
+
+
+def test_live_lease_is_never_requeued(tmp_path, clock):
+    queue = make_queue(tmp_path)
+    job, _ = upload(queue)
+    queue._claim()
+
+    other = make_queue(tmp_path)
+    for _ in range(5):
+        clock[0] += 40
+        queue._renew_leases()          # the owner's heartbeat
+        assert other.requeue_expired() == 0
+    assert queue.get(job["id"])["status"] == "running"
+
+
+def test_expired_lease_is_requeued(tmp_path, clock):
+    queue = make_queue(tmp_path)
+    job, _ = upload(queue)
+    queue._claim()
+
+    other = make_queue(tmp_path)
+    clock[0] += 60
+    assert other.requeue_expired() == 0   # lease ends exactly now
+    clock[0] += 1
+    assert other.requeue_expired() == 1
+    requeued = other.get(job["id"])
+    assert (requeued["status"], requeued["owner"], requeued["lease_until"]) == ("queued", None, None)
+    assert other._claim()["owner"] == other.owner
+
+
+def test_done_job_removes_upload_unless_keep_file(tmp_path, clock):
+    queue = make_queue(tmp_path)
+    job, path = upload(queue)
+    kept, kept_path = upload(queue, "kept.pdf", keep_file=True)
+
+    queue._run(queue._claim())
+    queue._run(queue._claim())
+    assert queue.get(job["id"])["status"] == "done"
+    assert queue.get(job["id"])["result"] == {"ok": True}
+    assert not path.exists()
+    assert queue.get(kept["id"])["status"] == "done"
+    assert kept_path.exists()
+
+
+def test_failed_job_keeps_upload_and_can_be_retried(tmp_path, clock):
+    attempts = []
+
+    def runner(job, progress):
+        attempts.append(job["id"])
+        progress(pages_parsed=3)
+        if len(attempts) == 1:
+            raise RuntimeError("parser crashed")
+        return {"chunks": 2}
+
+    queue = make_queue(tmp_path, runner)
+    job, path = upload(queue)
+    queue._run(queue._claim())
+    failed = queue.get(job["id"])
+    assert (failed["status"], failed["error"], failed["pages_parsed"]) == ("failed", "parser crashed", 3)
+    assert path.exists()
+
+    assert queue.retry(job["id"])["status"] == "queued"
+    assert queue.retry(job["id"]) is None   # only failed jobs can be retried
+    queue._run(queue._claim())
+    assert queue.get(job["id"])["status"] == "done"
+    assert not path.exists()
+
+
+def test_wait_returns_unfinished_job_after_timeout(tmp_path):
+    queue = make_queue(tmp_path)
+    job, _ = upload(queue)
+    assert queue.wait(job["id"], timeout=0)["status"] == "queued"
+    assert queue.wait("missing", timeout=0) is None
+
+
+def test_batch_summary(tmp_path, clock):
+    def runner(job, progress):
+        clock[0] += 2
+        progress(pages_parsed=4, chunks_upserted=10)
+        if job["document_name"] == "bad.pdf":
+            raise ValueError("broken")
+        return {}
+
+    queue = make_queue(tmp_path, runner)
+    assert queue.batch_summary("batch") is None
+    for name in ("a.pdf", "bad.pdf", "c.pdf"):
+        upload(queue, name, batch_id="batch")
+    upload(queue, "other.pdf")
+
+    queue._run(queue._claim())
+    summary = queue.batch_summary("batch")
+    assert summary["status"] == {"done": 1, "queued": 2}
+    assert not summary["complete"]
+
+    while (job := queue._claim()) is not None:
+        queue._run(job)
+    summary = queue.batch_summary("batch")
+    assert (summary["documents"], summary["status"], summary["complete"]) == (3, {"done": 2, "failed": 1}, True)
+    assert (summary["pages_parsed"], summary["chunks_upserted"]) == (12, 30)
+    assert summary["elapsed"] == 6.0
+    assert summary["failed"] == [{"id": summary["failed"][0]["id"], "document_name": "bad.pdf", "error": "broken"}]
@@ -0,0 +1,89 @@
+import numpy as np
+
+from src.llm.vector_store import HashingEmbedder, LocalStore, brute_force_search
+
+
+def record(record_id, text, document_name="doc.pdf"):
+    return {"id": record_id, "chunk_text": text, "document_name": document_name}
+
+
+def make_store(tmp_path):
+    return LocalStore(tmp_path / "store", HashingEmbedder(dim=64))
+
+
+def test_hashing_embedder_is_normalized_and_deterministic():
+    vectors = HashingEmbedder(dim=64).embed(["quarterly revenue report", "quarterly revenue report", ""])
+    assert np.allclose(vectors[0], vectors[1])
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[2].any()
+
+
+def test_search_ranks_matching_text_first(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert_records([
+        record("a", "invoice totals for march"),
+        record("b", "employee onboarding checklist"),
+        record("c", "holiday calendar"),
+    ])
+    hits = store.search("onboarding checklist", top_k=2)
+    assert [h["id"] for h in hits][0] == "b"
+    assert hits[0]["chunk_text"] == "employee onboarding checklist"
+    assert hits[0]["document_name"] == "doc.pdf"
+    assert len(hits) == 2
+
+
+def test_upsert_reuses_row_of_existing_id(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert_records([record("a", "old text"), record("b", "other")])
+    store.upsert_records([record("a", "new text about budgets")])
+    assert store.count == 2
+    assert store.search("budgets", top_k=1)[0]["chunk_text"] == "new text about budgets"
+
+
+def test_delete_by_id_and_document(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert_records([record("a", "x"), record("b", "y"), record("c", "z", document_name="other.pdf")])
+    store.delete(ids=["a"])
+    assert store.fetch_ids(["a", "b", "c"]) == {"b", "c"}
+    store.delete(document_name="doc.pdf")
+    assert store.fetch_ids(["a", "b", "c"]) == {"c"}
+    assert [h["id"] for h in store.search("x y z", top_k=5)] == ["c"]
+    assert store.stats()["total_vector_count"] == 1
+
+    store.upsert_records([record("a", "back again")])   # a deleted id comes back to life
+    assert store.fetch_ids(["a"]) == {"a"}
+
+
+def test_list_ids_by_prefix(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert_records([record("doc.pdf-p1-c0", "x"), record("doc.pdf-p2-c0", "y"), record("dog-p1-c0", "z")])
+    store.delete(ids=["doc.pdf-p2-c0"])
+    assert store.list_ids("doc.pdf-p") == ["doc.pdf-p1-c0"]
+
+
+def test_reopen_keeps_vectors_and_tombstones(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert_records([record(f"r{i}", f"record number {i}") for i in range(1500)])   # grows past one block
+    store.delete(ids=["r1"])
+
+    reopened = make_store(tmp_path)
+    assert reopened.count == 1500
+    assert reopened.fetch_ids(["r0", "r1", "r1499"]) == {"r0", "r1499"}
+    assert reopened.search("record number 1499", top_k=1)[0]["id"] == "r1499"
+
+
+def test_drop_empties_store(tmp_path):
+    store = make_store(tmp_path)
+    store.upsert_records([record("a", "x")])
+    store.drop()
+    assert store.count == 0
+    assert store.search("x") == []
+    assert store.list_ids("") == []
+
+
+def test_brute_force_search_skips_dead_rows():
+    matrix = np.eye(3, dtype=np.float32)
+    alive = np.array([True, False, True])
+    rows, scores = brute_force_search(matrix, alive, np.array([0.2, 1.0, 0.5], dtype=np.float32), k=2)
+    assert rows.tolist() == [2, 0]
+    assert np.allclose(scores, [0.5, 0.2])
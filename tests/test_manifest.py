@@ -0,0 +1,57 @@
+import sqlite3
+
+from src.llm.manifest import DocumentManifest, content_hash
+
+
+def test_replace_records_complete_chunk_set(tmp_path):
+    manifest = DocumentManifest(tmp_path / "manifest.sqlite", "local/docs/default")
+    manifest.replace("report", {"report#0": "h0", "report#1": "h1"})
+    manifest.replace("report", {"report#1": "h1b", "report#2": "h2"})
+
+    assert sorted(manifest.chunk_ids("report")) == ["report#1", "report#2"]
+    assert manifest.chunk_hashes("report") == {"report#1": "h1b", "report#2": "h2"}
+    assert manifest.has_document("report")
+    [doc] = manifest.documents()
+    assert doc["document_name"] == "report" and doc["chunks"] == 2
+
+
+def test_remove_and_unknown_document(tmp_path):
+    manifest = DocumentManifest(tmp_path / "manifest.sqlite", "s")
+    manifest.replace("a", {"a#0": "h"})
+    manifest.remove("a")
+    assert manifest.chunk_ids("a") == []
+    assert not manifest.has_document("a")
+    assert manifest.chunk_hashes("missing") == {}
+
+
+def test_scopes_share_a_file_without_mixing(tmp_path):
+    path = tmp_path / "manifest.sqlite"
+    first = DocumentManifest(path, "pinecone/idx/ns1")
+    second = DocumentManifest(path, "pinecone/idx/ns2")
+    first.replace("doc", {"doc#0": "h"})
+    second.replace("other", {"other#0": "h"})
+
+    assert [d["document_name"] for d in first.documents()] == ["doc"]
+    first.clear()
+    assert first.documents() == []
+    assert [d["document_name"] for d in second.documents()] == ["other"]
+
+
+def test_migrates_manifest_without_content_hash(tmp_path):
+    path = tmp_path / "manifest.sqlite"
+    con = sqlite3.connect(path)
+    con.execute(
+        "CREATE TABLE chunks (scope TEXT NOT NULL, document_name TEXT NOT NULL, "
+        "chunk_id TEXT NOT NULL, PRIMARY KEY (scope, chunk_id))"
+    )
+    con.execute("INSERT INTO chunks VALUES ('s', 'legacy', 'legacy#0')")
+    con.commit()
+    con.close()
+
+    manifest = DocumentManifest(path, "s")
+    assert manifest.chunk_hashes("legacy") == {"legacy#0": None}
+
+
+def test_content_hash_is_stable():
+    assert content_hash("chunk text") == content_hash("chunk text")
+    assert content_hash("chunk text") != content_hash("chunk text.")
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("pinecone")
+
+from benchmarks.fake_pinecone import FakePineconeServer
+from pinecone import Pinecone
+from src.llm import vector_store
+from src.llm.vector_store import PineconeStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """PineconeStore on a real SDK Index handle talking to the local API stub."""
+    with FakePineconeServer(latency=0) as server:
+        monkeypatch.setitem(vector_store._index_handles, "test-index", Pinecone(api_key="test").Index(host=server.url))
+        yield PineconeStore("test-index", "ns")
+
+
+def records(document_name, count):
+    return [
+        {"id": f"{document_name}-p1-c{i}", "chunk_text": f"chunk {i}", "document_name": document_name}
+        for i in range(count)
+    ]
+
+
+def test_list_ids_returns_id_strings(store):
+    store.upsert_records(records("a.pdf", 3) + records("b.pdf", 1))
+    assert sorted(store.list_ids("a.pdf-p")) == ["a.pdf-p1-c0", "a.pdf-p1-c1", "a.pdf-p1-c2"]
+
+
+def test_fetch_and_delete_ids(store):
+    store.upsert_records(records("a.pdf", 2))
+    assert store.fetch_ids(["a.pdf-p1-c0", "missing"]) == {"a.pdf-p1-c0"}
+    store.delete(ids=["a.pdf-p1-c0"])
+    assert store.list_ids("a.pdf-p") == ["a.pdf-p1-c1"]
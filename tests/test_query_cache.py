@@ -0,0 +1,114 @@
+import pytest
+
+from src.utils import query_cache, table_cache
+from src.utils.query_cache import QueryCache, TTLCache, normalize_question, schema_hash
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced `time.monotonic()`."""
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.put("a", 1)
+    clock[0] += 9
+    assert cache.get("a") == 1
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used_entry(clock):
+    cache = TTLCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1   # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_byte_cap(clock):
+    value = "x" * 40   # 42 bytes of JSON
+    cache = TTLCache(max_bytes=100)
+    cache.put("a", value)
+    cache.put("b", value)
+    cache.put("c", value)
+    assert cache.get("a") is None
+    assert len(cache) == 2
+
+    cache.put("huge", "x" * 200)   # never fits, so it is not stored
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_put_replaces_value_and_size(clock):
+    cache = TTLCache(max_bytes=100)
+    cache.put("a", "x" * 90)
+    cache.put("a", "y")
+    cache.put("b", "z" * 60)
+    assert cache.get("a") == "y"
+    assert cache.get("b") == "z" * 60
+
+
+def test_normalize_question_keeps_case():
+    assert normalize_question("  How many   orders\nfrom 'Open' tickets?? ") == "How many orders from 'Open' tickets"
+    assert normalize_question("count open") != normalize_question("count Open")
+
+
+def test_schema_hash_ignores_data_but_not_layout():
+    profile = [{"name": "id", "type": "BIGINT", "samples": [1, 2]}]
+    refreshed = [{"name": "id", "type": "BIGINT", "samples": [7, 8]}]
+    retyped = [{"name": "id", "type": "VARCHAR", "samples": [1, 2]}]
+    assert schema_hash("t", {"t": profile}) == schema_hash("t", {"t": refreshed})
+    assert schema_hash("t", {"t": profile}) != schema_hash("t", {"t": retyped})
+    assert schema_hash("t", {"t": profile}) != schema_hash("u", {"u": profile})
+
+
+def test_query_cache_keys():
+    cache = QueryCache({})
+    cache.put_sql("Total sales?", "schema-1", "SELECT 1")
+    assert cache.get_sql("total sales", "schema-1") is None
+    assert cache.get_sql("Total   sales", "schema-1") == "SELECT 1"
+    assert cache.get_sql("Total sales", "schema-2") is None
+
+    cache.put_rows("SELECT 1", "file-1", {"rows": [[1]]})
+    assert cache.get_rows("SELECT 1", "file-1") == {"rows": [[1]]}
+    assert cache.get_rows("SELECT 1", "file-2") is None
+
+
+def test_disabled_query_cache_stores_nothing():
+    cache = QueryCache({"query_cache": False})
+    cache.put_sql("q", "s", "SELECT 1")
+    cache.put_rows("SELECT 1", "f", [])
+    assert cache.get_sql("q", "s") is None
+    assert cache.get_rows("SELECT 1", "f") is None
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_table_fingerprint_hashes_local_file_once(tmp_path, monkeypatch, cached):
+    pytest.importorskip("duckdb")
+    source = tmp_path / "data.csv"
+    source.write_text("id\n1\n")
+    sql_cfg = {"table_cache": cached}
+    monkeypatch.setattr(table_cache, "_table_cache", table_cache.TableCache(tmp_path / "tables", 10 * 1024 * 1024))
+    monkeypatch.setattr(table_cache, "_path_hashes", {})
+    calls = []
+    file_sha256 = table_cache.file_sha256
+
+    def counting_sha256(src):
+        calls.append(src)
+        return file_sha256(src)
+
+    monkeypatch.setattr(table_cache, "file_sha256", counting_sha256)
+
+    fingerprint = table_cache.table_fingerprint(str(source), sql_cfg)
+    con = table_cache.connect_table(str(source), "t", sql_cfg, fingerprint)
+    con.close()
+    assert table_cache.table_fingerprint(str(source), sql_cfg) == fingerprint
+    assert len(calls) == 1
@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+pytest.importorskip("pyarrow")
+
+from src.utils.query_results import (
+    ResultQueryError, ResultStore, bounded_result, export_result, fetch_page, materialize_result, page_query,
+    strip_sql,
+)
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect(database=":memory:")
+    con.execute("CREATE TABLE t AS SELECT range AS id, 'row ' || range AS label FROM range(50)")
+    yield con
+    con.close()
+
+
+@pytest.fixture
+def sql_cfg(tmp_path):
+    return {"table_cache": False, "result_dir": str(tmp_path / "results")}
+
+
+def test_strip_sql():
+    assert strip_sql("  SELECT 1;; \n") == "SELECT 1"
+
+
+def test_page_query_survives_trailing_comment(con):
+    sql = "SELECT id FROM t ORDER BY id -- first rows only"
+    assert con.execute(page_query(sql, 3, 10)).fetchall() == [(10,), (11,), (12,)]
+
+
+def test_result_within_limits(con):
+    result = bounded_result(con, "SELECT * FROM t WHERE id < 5", max_rows=10)
+    assert result["columns"] == ["id", "label"]
+    assert result["rows"][0] == {"id": 0, "label": "row 0"}
+    assert (result["row_count"], result["returned_rows"], result["truncated"]) == (5, 5, False)
+    assert result["wrapped"]
+
+
+def test_truncated_result_counts_all_rows(con):
+    result = bounded_result(con, "SELECT * FROM t ORDER BY id -- comment", max_rows=10)
+    assert (result["row_count"], result["returned_rows"], result["truncated"]) == (50, 10, True)
+    assert [r["id"] for r in result["rows"]] == list(range(10))
+
+    uncounted = bounded_result(con, "SELECT * FROM t", max_rows=10, count_rows=False)
+    assert uncounted["row_count"] is None and uncounted["truncated"]
+
+
+def test_byte_cap_keeps_at_least_one_row(con):
+    result = bounded_result(con, "SELECT * FROM t ORDER BY id", max_rows=20, max_bytes=100)
+    assert 1 <= result["returned_rows"] < 20
+    assert result["truncated"]
+
+    single = bounded_result(con, "SELECT * FROM t ORDER BY id", max_rows=20, max_bytes=1)
+    assert single["returned_rows"] == 1
+
+
+def test_statements_that_cannot_be_wrapped_are_capped(con):
+    for i in range(5):
+        con.execute(f"CREATE TABLE extra_{i} (x INTEGER)")
+    result = bounded_result(con, "PRAGMA show_tables", max_rows=3)
+    assert not result["wrapped"]
+    assert result["columns"] == ["name"]
+    assert (result["returned_rows"], result["truncated"], result["row_count"]) == (3, True, None)
+
+
+def test_pages_cover_result_once(tmp_path, sql_cfg):
+    source = tmp_path / "data.csv"
+    source.write_text("id\n" + "".join(f"{i}\n" for i in range(25)))
+    store = ResultStore()
+    result_id = store.register("SELECT id * 2 AS doubled FROM data -- comment", str(source), "data", "fp", sql_cfg)
+    entry = store.get(result_id)
+
+    rows, offset = [], 0
+    while offset is not None:
+        page = fetch_page(entry, offset, 10, sql_cfg)
+        rows += [r["doubled"] for r in page["rows"]]
+        offset = page["next_offset"]
+    assert sorted(rows) == [2 * i for i in range(25)]
+    assert len(rows) == 25
+
+    # Later pages and downloads read the same materialized file, not the source
+    os.remove(source)
+    assert fetch_page(entry, 20, 10, sql_cfg)["rows"] == [{"doubled": v} for v in rows[20:]]
+    export_result(entry, "csv", tmp_path / "out.csv", sql_cfg)
+    exported = (tmp_path / "out.csv").read_text().split()
+    assert exported == ["doubled"] + [str(v) for v in rows]
+
+
+def test_failing_sql_raises_result_query_error(tmp_path, sql_cfg):
+    source = tmp_path / "data.csv"
+    source.write_text("id\n1\n")
+    store = ResultStore()
+    entry = store.get(store.register("SELECT missing FROM data", str(source), "data", "fp", sql_cfg))
+    with pytest.raises(ResultQueryError):
+        fetch_page(entry, 0, 10, sql_cfg)
+    with pytest.raises(ResultQueryError):
+        export_result(entry, "csv", tmp_path / "out.csv", sql_cfg)
+
+
+def test_result_id_depends_on_sql_table_and_content(sql_cfg):
+    store = ResultStore()
+    first = store.register("SELECT 1", "a.csv", "t", "fp-1", sql_cfg)
+    assert store.register("SELECT 1;", "b.csv", "t", "fp-1", sql_cfg) == first
+    assert store.register("SELECT 1", "a.csv", "t", "fp-2", sql_cfg) != first
+    assert store.register("SELECT 2", "a.csv", "t", "fp-1", sql_cfg) != first
+    assert store.get(first)["source"] == "b.csv"
+
+
+def test_idle_materialized_results_are_removed(tmp_path, sql_cfg):
+    source = tmp_path / "data.csv"
+    source.write_text("id\n1\n")
+    store = ResultStore()
+    old = store.get(store.register("SELECT * FROM data", str(source), "data", "fp-1", sql_cfg))
+    new = store.get(store.register("SELECT id FROM data", str(source), "data", "fp-1", sql_cfg))
+
+    old_path = materialize_result(old, sql_cfg)
+    os.utime(old_path, (1, 1))
+    new_path = materialize_result(new, {**sql_cfg, "result_store_ttl_seconds": 60})
+    assert new_path.exists()
+    assert not old_path.exists()
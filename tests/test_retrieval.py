@@ -0,0 +1,48 @@
+from src.utils.retrieval import BM25Ranker, estimate_tokens, tokenize
+
+
+def chunk(i, text):
+    return {"id": f"doc#{i}", "chunk_text": text}
+
+
+DOCS = [
+    chunk(0, "Introduction to the annual report and company overview."),
+    chunk(1, "Revenue grew 12 percent; revenue from cloud services doubled."),
+    chunk(2, "Employee headcount and office locations."),
+    chunk(3, "Risk factors include currency and revenue concentration."),
+]
+
+
+def test_tokenize_drops_stopwords_and_case():
+    assert tokenize("What is the Revenue of ACME?") == ["revenue", "acme"]
+
+
+def test_scores_prefer_term_frequency():
+    scores = BM25Ranker().score("revenue", DOCS)
+    assert scores[0] == scores[2] == 0
+    assert scores[1] > scores[3] > 0
+
+
+def test_top_k_orders_by_score():
+    top = BM25Ranker().top_k("cloud revenue", DOCS, k=2)
+    assert [d["id"] for d in top] == ["doc#1", "doc#3"]
+    assert top[0]["score"] >= top[1]["score"]
+
+
+def test_top_k_falls_back_to_leading_chunks():
+    top = BM25Ranker().top_k("zebra", DOCS, k=2)
+    assert [d["id"] for d in top] == ["doc#0", "doc#1"]
+
+
+def test_top_k_respects_token_budget():
+    docs = [chunk(i, "revenue " + "x" * 400) for i in range(5)]
+    budget = estimate_tokens(docs[0]["chunk_text"]) * 2
+    top = BM25Ranker().top_k("revenue", docs, k=5, max_tokens=budget)
+    assert len(top) == 2
+
+
+def test_empty_inputs():
+    ranker = BM25Ranker()
+    assert ranker.score("revenue", []) == []
+    assert ranker.score("the of", DOCS) == [0.0] * len(DOCS)
+    assert ranker.top_k("revenue", []) == []
@@ -0,0 +1,56 @@
+import pytest
+
+from src.utils import session_store
+from src.utils.session_store import SessionStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_state_is_per_session_and_persistent():
+    store = SessionStore()
+    store.get("a")["turns"] = 1
+    store.get("b")["turns"] = 5
+    assert store.get("a") == {"turns": 1}
+    assert store.get("b") == {"turns": 5}
+
+
+def test_lru_bound_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2)
+    store.get("a")["v"] = 1
+    store.get("b")["v"] = 2
+    store.get("a")            # "b" is now the least recently used
+    store.get("c")
+    assert len(store) == 2
+    assert store.get("a") == {"v": 1}
+    assert store.get("b") == {}
+
+
+def test_idle_sessions_expire(clock):
+    store = SessionStore(ttl=60)
+    store.get("a")["v"] = 1
+    clock[0] += 30
+    store.get("b")["v"] = 2
+    clock[0] += 45            # "a" idle for 75s, "b" for 45s
+    assert store.get("b") == {"v": 2}
+    assert store.get("a") == {}
+
+
+def test_use_refreshes_ttl(clock):
+    store = SessionStore(ttl=60)
+    store.get("a")["v"] = 1
+    for _ in range(5):
+        clock[0] += 50
+        assert store.get("a") == {"v": 1}
+
+
+def test_pop():
+    store = SessionStore()
+    store.get("a")["v"] = 1
+    assert store.pop("a") == {"v": 1}
+    assert store.pop("a") is None
+    assert len(store) == 0
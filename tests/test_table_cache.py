@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+from src.utils import table_cache
+from src.utils.table_cache import TableCache
+
+
+def write_csv(path, rows):
+    path.write_text("id,name\n" + "".join(f"{i},name-{i}\n" for i in range(rows)))
+    return path
+
+
+def write_workbook(path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sales = workbook.active
+    sales.title = "Sales"
+    sales.append(["order_id", "amount"])
+    sales.append([1, 9.5])
+    regions = workbook.create_sheet("Regions")
+    regions.append(["region"])
+    regions.append(["north"])
+    workbook.save(path)
+    return path
+
+
+def test_miss_builds_once_then_hits(tmp_path, monkeypatch):
+    cache = TableCache(tmp_path / "tables", max_bytes=100 * 1024 * 1024)
+    source = write_csv(tmp_path / "data.csv", 10)
+    path = cache.get_or_build(source)
+    assert path.exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache hit should not reload the file")
+
+    monkeypatch.setattr(table_cache, "load_tables", fail)
+    assert cache.get_or_build(source) == path
+    con = cache.connect(source, "sales")
+    try:
+        assert con.execute("SELECT count(*) FROM sales").fetchone()[0] == 10
+    finally:
+        con.close()
+
+
+def test_same_content_under_another_name_reuses_entry(tmp_path):
+    cache = TableCache(tmp_path / "tables", max_bytes=100 * 1024 * 1024)
+    first = write_csv(tmp_path / "a.csv", 5)
+    second = write_csv(tmp_path / "b.csv", 5)
+    assert cache.key(first) == cache.key(second)
+    assert cache.get_or_build(first) == cache.get_or_build(second)
+
+    changed = write_csv(tmp_path / "c.csv", 6)
+    assert cache.key(changed) != cache.key(first)
+
+
+def test_workbook_sheets_become_views(tmp_path):
+    cache = TableCache(tmp_path / "tables", max_bytes=100 * 1024 * 1024)
+    source = write_workbook(tmp_path / "book.xlsx")
+    con = cache.connect(source, "report")
+    try:
+        views = {name for (name,) in con.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()}
+        assert views == {"report", "report_regions"}
+        assert con.execute("SELECT amount FROM report").fetchone()[0] == 9.5
+        assert con.execute("SELECT region FROM report_regions").fetchone()[0] == "north"
+    finally:
+        con.close()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    directory = tmp_path / "tables"
+    cache = TableCache(directory, max_bytes=100 * 1024 * 1024)
+    sources = [write_csv(tmp_path / f"{n}.csv", n) for n in (1, 2, 3)]
+    paths = [cache.get_or_build(s) for s in sources]
+    for age, path in zip((300, 100, 200), paths):   # second file is the oldest
+        os.utime(path, (age, age))
+
+    cache.max_bytes = sum(p.stat().st_size for p in paths) - 1
+    cache._evict()
+    assert [p.exists() for p in paths] == [True, False, True]
+
+
+def test_new_entry_is_kept_even_when_over_budget(tmp_path):
+    cache = TableCache(tmp_path / "tables", max_bytes=1)
+    old = cache.get_or_build(write_csv(tmp_path / "old.csv", 1))
+    new = cache.get_or_build(write_csv(tmp_path / "new.csv", 2))
+    assert new.exists()
+    assert not old.exists()
+
+
+def test_connect_rebuilds_entry_evicted_before_attach(tmp_path, monkeypatch):
+    cache = TableCache(tmp_path / "tables", max_bytes=100 * 1024 * 1024)
+    source = write_csv(tmp_path / "data.csv", 3)
+    get_or_build = cache.get_or_build
+    calls = []
+
+    def evicted_after_build(src, key=None):
+        path = get_or_build(src, key)
+        if not calls:
+            path.unlink()   # another thread's eviction wins the race
+        calls.append(path)
+        return path
+
+    monkeypatch.setattr(cache, "get_or_build", evicted_after_build)
+    con = cache.connect(source, "data")
+    try:
+        assert con.execute("SELECT count(*) FROM data").fetchone()[0] == 3
+    finally:
+        con.close()
+    assert len(calls) == 2
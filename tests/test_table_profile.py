@@ -0,0 +1,64 @@
+import pytest
+
+from src.utils.table_profile import format_schema, prune_columns, tokens
+
+
+def column(name, type_="VARCHAR", samples=()):
+    return {
+        "name": name, "type": type_, "distinct": 10, "min": None, "max": None,
+        "null_pct": 0.0, "samples": list(samples),
+    }
+
+
+PROFILE = [
+    column("order_id", "BIGINT"),
+    column("customerName"),
+    column("region", samples=["North", "South"]),
+    column("unit_price", "DOUBLE"),
+    column("quantity", "BIGINT"),
+    column("order_date", "DATE"),
+]
+
+
+def names(columns):
+    return [c["name"] for c in columns]
+
+
+def test_tokens_split_case_and_drop_plurals_and_stopwords():
+    assert tokens("customerName") == {"customer", "name"}
+    assert tokens("unit_prices") == {"unit", "price"}
+    assert tokens("What is the total of orders") == {"total", "order"}
+
+
+def test_small_tables_are_kept_whole():
+    assert prune_columns(PROFILE, "anything", 10) == PROFILE
+    assert prune_columns(PROFILE, "anything", 0) == PROFILE
+
+
+def test_keeps_related_columns_in_table_order():
+    kept = prune_columns(PROFILE, "total quantity per customer", 3)
+    assert names(kept) == ["order_id", "customerName", "quantity"]
+
+
+def test_sample_values_in_question_count():
+    kept = prune_columns(PROFILE, "How many shipped to the north?", 1)
+    assert names(kept) == ["region"]
+
+
+def test_partial_name_matches_count():
+    kept = prune_columns(PROFILE, "average unitprice", 1)
+    assert names(kept) == ["unit_price"]
+
+
+@pytest.mark.parametrize("question", ["", "zzz"])
+def test_unrelated_question_gets_leading_columns(question):
+    assert names(prune_columns(PROFILE, question, 2)) == ["order_id", "customerName"]
+
+
+def test_format_schema_notes_omitted_columns():
+    text = format_schema(PROFILE, "quantity by region", 2)
+    lines = text.splitlines()
+    assert lines[0].startswith("region (VARCHAR)")
+    assert "e.g. 'North', 'South'" in lines[0]
+    assert lines[1].startswith("quantity (BIGINT)")
+    assert lines[-1] == "(4 less relevant columns omitted)"